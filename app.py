@@ -1,12 +1,22 @@
+import time
+APP_START = time.perf_counter() # Streamlit reruns the script: this times every paint
+
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 from collections import Counter
 import helper
 import logic
-import plotly.graph_objects as go
+import cache
+import pipeline
+import search
+import translate
+import model_server
+import cube
+import wordclouds
+import report
+import export
+# plotly, wordcloud, sklearn, transformers, FPDF and deep_translator
+# are imported where they are used, so the first paint does not wait for them
 
 # 1. Page Config
 st.set_page_config(page_title="AI YouTube Analyzer", page_icon="🤖", layout="wide")
@@ -266,15 +276,72 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# 3. Load Model
+# 3. Load Model (backend via YSA_MODEL_BACKEND: pytorch / int8 / onnx)
+# With YSA_MODEL_SERVER set, every Streamlit process shares the model server's copy
+@st.cache_resource
+def load_ai_model(backend=logic.DEFAULT_BACKEND):
+    return model_server.load_model(backend)
+
+@st.cache_resource
+def get_analysis_cache():
+    return cache.AnalysisCache()
+
+@st.cache_resource
+def get_video_store():
+    return cache.VideoStore()
+
+@st.cache_resource
+def get_history_index():
+    return search.HistoryIndex()
+
+@st.cache_resource
+def get_translation_service():
+    return translate.TranslationService()
+
+@st.cache_resource
+def get_wordcloud_cache():
+    # PNGs keyed by dataset + filter, shared by all sessions
+    return wordclouds.WordCloudCache()
+
 @st.cache_resource
-def load_ai_model():
-    return logic.load_bert_model()
+def get_report_cache():
+    # Finished PDFs keyed by dataset + filter, shared by all sessions
+    return report.ReportCache()
+
+@st.cache_resource
+def get_export_cache():
+    # Export bytes keyed by dataset + filter + format, shared by all sessions
+    return export.ExportCache()
+
+@st.cache_resource
+def get_keyword_matcher(custom_text):
+    # Built-in + custom keyword sets compiled into one pattern
+    return logic.build_keyword_matcher(logic.parse_keyword_sets(custom_text))
+
+@st.cache_resource
+def get_model_worker(_model):
+    # One scoring thread shared by every multi-video run
+    return pipeline.ModelWorker(_model)
+
+def get_model():
+    # Loaded on the first analysis, not before the page is drawn
+    try:
+        return load_ai_model()
+    except Exception as e:
+        st.error("Error loading AI Model. Please check your internet connection.")
+        st.stop()
+
+def get_shared_worker():
+    model = get_model()
+    # The model server already batches across sessions
+    return model if hasattr(model, 'score_batch') else get_model_worker(model)
 
 try:
-    roberta_model = load_ai_model()
+    analysis_cache = get_analysis_cache()
+    video_store = get_video_store()
+    history_index = get_history_index()
 except Exception as e:
-    st.error("Error loading AI Model. Please check your internet connection.")
+    st.error("Error opening the local cache.")
     st.stop()
 
 # 4. Sidebar
@@ -297,7 +364,54 @@ st.sidebar.markdown("""
 """, unsafe_allow_html=True)
 
 # --- MODE SELECTOR ---
-app_mode = st.sidebar.radio("Select Mode", ["Single Video Analysis", "⚔️ Battle Mode", "📈 Channel Trends"])
+app_mode = st.sidebar.radio("Select Mode", ["Single Video Analysis", "⚔️ Battle Mode", "📈 Channel Trends", "🔎 Search History"])
+st.sidebar.caption(f"⏱️ First paint in {(time.perf_counter() - APP_START) * 1000:.0f} ms")
+
+def store_single_data(df):
+    # Keep the fingerprint next to the data so caches can check it cheaply
+    st.session_state['single_data'] = df
+    st.session_state['single_fp'] = logic.dataset_fingerprint(df)
+
+def get_search_index(df, fingerprint):
+    # Fitted once per dataset; rebuilt only when the data changes
+    index = st.session_state.get('rag_index')
+    if index is None or index.fingerprint != fingerprint:
+        index = search.CommentIndex(df, fingerprint=fingerprint)
+        st.session_state['rag_index'] = index
+    return index
+
+def get_cube(df, fingerprint, keyword=""):
+    # One aggregate cube per (dataset, keyword filter); sentiment filters are slices of it.
+    # Keyword cubes keep a boolean mask over the session's frame, not a copy of the rows.
+    cubes = st.session_state.get('cubes')
+    if cubes is None or cubes['fingerprint'] != fingerprint:
+        cubes = {'fingerprint': fingerprint, 'by_keyword': {}}
+        st.session_state['cubes'] = cubes
+    key = keyword.lower()
+    if key not in cubes['by_keyword']:
+        mask = df['Clean_Text'].str.contains(keyword, case=False, na=False) if keyword else None
+        if len(cubes['by_keyword']) >= 8:
+            cubes['by_keyword'] = {'': cubes['by_keyword'].get('')} if '' in cubes['by_keyword'] else {}
+        cubes['by_keyword'][key] = cube.AggregateCube(df, fingerprint=fingerprint, mask=mask)
+    return cubes['by_keyword'][key]
+
+def render_pipeline_stats(df):
+    # How much model work the cache + dedup saved on this run
+    stats = df.attrs.get('pipeline_stats')
+    if stats:
+        st.caption(f"♻️ Model ran on {stats['unique']} unique texts for {stats['rows']} unscored comments "
+                   f"({stats['dedup_ratio']*100:.0f}% saved by dedup, {stats['cache_hits']} cache hits).")
+        if 'translated' in stats:
+            st.caption(f"🌍 {stats['translated']} non-English comments translated before scoring.")
+
+def render_queue_metrics():
+    # Shared scheduler: how many sessions' comments end up in the same round
+    worker = get_shared_worker()
+    if hasattr(worker, 'metrics'):
+        m = worker.metrics()
+        st.caption(f"🧮 Model queue: {m['queue_depth']} waiting, {m['rounds']} rounds, "
+                   f"{m['avg_round_texts']:.0f} texts/round ({m['batch_fill']*100:.0f}% full), "
+                   f"{m['avg_jobs_per_round']:.1f} requests/round, {m['avg_wait_ms']:.0f} ms avg wait.")
 
 # --- SINGLE MODE FUNCTION ---
 def render_single_mode():
@@ -311,26 +425,58 @@ def render_single_mode():
     """, unsafe_allow_html=True)
     
     video_url = st.text_input("Paste YouTube Link:", placeholder="https://www.youtube.com/watch?v=...")
+    refresh_mode = st.checkbox("🔄 Incremental refresh (only fetch comments newer than the last run)")
+    with st.expander("🏷️ Custom keyword sets"):
+        custom_keywords = st.text_area("One set per line", placeholder="audio: mic, sound, volume\ngear: camera, lens", key="custom_keywords")
+    keyword_matcher = get_keyword_matcher(custom_keywords)
+    near_dups = st.checkbox("🧬 Score near-duplicate comments once (MinHash)")
+    max_replies = st.number_input("💬 Also fetch replies (max per video, 0 = off)", min_value=0, max_value=5000,
+                                  value=0, step=100, help="Expands the busiest threads first.",
+                                  disabled=refresh_mode)
+    if refresh_mode:
+        st.caption("Incremental refresh only fetches new top-level comments; replies are not fetched.")
+    
+    # Translation Feature: runs inside the pipeline, before scoring
+    translator = get_translation_service() if st.session_state.get('enable_translation') else None
     
     if st.button("Run AI Analysis", type="primary"):
         if not video_url:
             st.warning("Please enter a valid link.")
+        elif refresh_mode:
+            with st.spinner("🔄 Fetching new comments..."):
+                result = pipeline.refresh_video(video_url, get_shared_worker(), video_store, cache=analysis_cache,
+                                                history=history_index, matcher=keyword_matcher,
+                                                near_duplicates=near_dups, translator=translator)
+                if isinstance(result, dict):
+                    st.error(f"Error: {result['error']}")
+                elif result[0].empty:
+                    st.warning("No comments found.")
+                else:
+                    processed_data, new_count = result
+                    store_single_data(processed_data)
+                    st.success(f"{new_count} new comments. Analyzed {len(processed_data)} comments in total.")
+                    if processed_data.attrs.get('refresh_truncated'):
+                        st.info("More new comments than the fetch limit. Refresh again to fetch the rest.")
+                    render_pipeline_stats(processed_data)
+                    render_queue_metrics()
         else:
             with st.spinner("🤖 AI is reading comments..."):
-                raw_data = helper.fetch_comments(video_url)
-                if isinstance(raw_data, dict) and "error" in raw_data:
-                    st.error(f"Error: {raw_data['error']}")
-                elif raw_data.empty:
+                # Each page is scored while the next one is fetched
+                processed_data = pipeline.analyze_video(video_url, get_shared_worker(), cache=analysis_cache,
+                                                        history=history_index, max_replies=int(max_replies),
+                                                        process_kwargs=dict(matcher=keyword_matcher,
+                                                                            near_duplicates=near_dups,
+                                                                            translator=translator))
+                if isinstance(processed_data, dict):
+                    st.error(f"Error: {processed_data['error']}")
+                elif processed_data.empty:
                     st.warning("No comments found.")
                 else:
-                    processed_data = logic.process_data_deep_learning(raw_data, roberta_model)
-                    # Translation Feature
-                    if st.session_state.get('enable_translation'):
-                        with st.spinner("🌍 Translating comments (this may take a while)..."):
-                            processed_data['Clean_Text'] = processed_data['Clean_Text'].apply(logic.translate_comment)
-                            
-                    st.session_state['single_data'] = processed_data
-                    st.success(f"Analyzed {len(processed_data)} comments.")
+                    store_single_data(processed_data)
+                    replies = int(processed_data['Parent_Id'].notna().sum())
+                    st.success(f"Analyzed {len(processed_data)} comments ({replies} replies).")
+                    render_pipeline_stats(processed_data)
+                    render_queue_metrics()
 
     # Function to render the dashboard (Persistent)
     if 'single_data' in st.session_state:
@@ -347,11 +493,16 @@ def render_single_mode():
         sentiment_filter = st.sidebar.multiselect("Filter by Sentiment", ["Positive", "Negative", "Neutral"], default=["Positive", "Negative", "Neutral"])
         keyword_filter = st.sidebar.text_input("Filter by Keyword", key="single_kw")
         
-        filtered_df = processed_data[processed_data['Sentiment'].isin(sentiment_filter)]
-        if keyword_filter:
-            filtered_df = filtered_df[filtered_df['Clean_Text'].str.contains(keyword_filter, case=False, na=False)]
+        # Aggregates are built once per dataset + keyword; reruns only slice them
+        fingerprint = st.session_state['single_fp']
+        view = get_cube(processed_data, fingerprint, keyword_filter)
+        totals = view.totals(sentiment_filter)
+        filtered_df = view.rows(sentiment_filter)
+        # Word cloud renders in the background while the other tabs are drawn
+        filter_key = (fingerprint, keyword_filter.lower(), tuple(sorted(sentiment_filter)))
+        cloud_png = get_wordcloud_cache().submit(filter_key, filtered_df['Clean_Text'])
         
-        st.info(f"Showing {len(filtered_df)} filtered comments out of {len(processed_data)} total.")
+        st.info(f"Showing {totals['total']} filtered comments out of {len(processed_data)} total.")
         
         # Executive Summary in Bento Card
         st.markdown(f"""
@@ -359,24 +510,25 @@ def render_single_mode():
             <div style="font-size: 0.8rem; color: #6366f1; font-weight: 700; text-transform: uppercase; margin-bottom: 10px; letter-spacing: 0.1em;">
                 ✨ AI Insights
             </div>
-            {logic.generate_smart_summary(processed_data)}
+            {get_cube(processed_data, fingerprint).summary()}
         </div>
         """, unsafe_allow_html=True)
 
         # Charts use filtered_data
         data_to_plot = filtered_df
         
+        import plotly.express as px
         tab1, tab2, tab3, tab4, tab5, tab6, tab7, tab8 = st.tabs(["📊 Dashboard", "🧠 Deep Insights", "👥 Personas", "🚀 Opportunities", "💬 Community Hub", "🛡️ Moderate", "📂 Raw Data", "🤖 Chat"])
         
         with tab1:
             # Bento Grid Row 1: Key Metrics
             b1, b2 = st.columns([2, 1])
             
-            pos = len(data_to_plot[data_to_plot['Sentiment'] == 'Positive'])
-            neg = len(data_to_plot[data_to_plot['Sentiment'] == 'Negative'])
-            neu = len(data_to_plot[data_to_plot['Sentiment'] == 'Neutral'])
-            total_len = len(data_to_plot) if len(data_to_plot) > 0 else 1
-            trust_score = logic.calculate_trust_score(data_to_plot)
+            pos = totals['Positive']
+            neg = totals['Negative']
+            neu = totals['Neutral']
+            total_len = totals['total'] if totals['total'] > 0 else 1
+            trust_score = view.trust_score(sentiment_filter)
             
             with b1:
                 st.markdown(f"""
@@ -432,14 +584,16 @@ def render_single_mode():
             # Charts
             c_left, c_right = st.columns(2)
             with c_left:
-                fig = px.pie(data_to_plot, names='Sentiment', title='Mood Distribution', color='Sentiment', hole=0.6,
+                fig = px.pie(view.counts_by(['Sentiment'], sentiment_filter), names='Sentiment', values='Count',
+                             title='Mood Distribution', color='Sentiment', hole=0.6,
                                 color_discrete_map={'Positive':'#10b981', 'Negative':'#ef4444', 'Neutral':'#6366f1'})
                 fig.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color="#ffffff", margin=dict(t=50, b=0, l=0, r=0))
                 st.plotly_chart(fig, use_container_width=True)
             
             with c_right:
                 if 'Published_At' in data_to_plot.columns:
-                    fig_time = px.histogram(data_to_plot, x="Published_At", color="Sentiment", title="Sentiment Over Time",
+                    fig_time = px.bar(view.counts_by(['Period', 'Sentiment'], sentiment_filter), x="Period", y="Count",
+                                      color="Sentiment", title="Sentiment Over Time",
                                             color_discrete_map={'Positive':'#10b981', 'Negative':'#ef4444', 'Neutral':'#6366f1'})
                     fig_time.update_layout(paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font_color="#ffffff")
                     st.plotly_chart(fig_time, use_container_width=True)
@@ -447,7 +601,7 @@ def render_single_mode():
             # AI Reply Assistant (In Dashboard)
             st.markdown("### 🗣️ AI Reply Assistant")
             # Pick a random unanswered question/comment to demonstrate
-            sample = data_to_plot[data_to_plot['Reply_Count']==0].head(1)
+            sample = data_to_plot[logic.unanswered(data_to_plot)].head(1)
             if not sample.empty:
                 row = sample.iloc[0]
                 st.info(f"**Comment**: {row['Comment']}")
@@ -462,23 +616,22 @@ def render_single_mode():
             with col_cloud:
                 st.subheader("☁️ Word Cloud")
                 if not data_to_plot.empty:
-                    text_combined = " ".join(data_to_plot['Clean_Text'])
-                    wordcloud = WordCloud(width=800, height=400, background_color='white').generate(text_combined)
-                    fig, ax = plt.subplots()
-                    ax.imshow(wordcloud, interpolation='bilinear')
-                    ax.axis("off")
-                    st.pyplot(fig)
+                    try:
+                        png = cloud_png.result()
+                        if png:
+                            st.image(png, use_container_width=True)
+                    except Exception as e:
+                        st.info(f"Word cloud unavailable: {e}")
             with col_emoji:
                 st.subheader("🔥 Top Emojis")
-                all_emojis = [char for text in data_to_plot['Emojis'] for char in text]
-                if all_emojis:
-                    emoji_counts = Counter(all_emojis).most_common(10)
+                emoji_counts = view.emoji_counts(sentiment_filter)
+                if emoji_counts:
                     emoji_df = pd.DataFrame(emoji_counts, columns=['Emoji', 'Count'])
                     st.plotly_chart(px.bar(emoji_df, x='Emoji', y='Count'), use_container_width=True)
             
             st.subheader("🧩 Top Themes (Bi-grams)")
             if not data_to_plot.empty:
-                bigrams = logic.extract_bigrams(data_to_plot['Clean_Text'].dropna())
+                bigrams = view.bigrams(sentiment_filter)
                 if bigrams:
                     bg_df = pd.DataFrame(bigrams, columns=['Phrase', 'Count'])
                     st.plotly_chart(px.bar(bg_df, x='Count', y='Phrase', orientation='h'), use_container_width=True)
@@ -486,8 +639,7 @@ def render_single_mode():
         with tab3: # Personas
             st.subheader("👥 Audience Squads")
             if 'Persona' in data_to_plot.columns:
-                persona_counts = data_to_plot['Persona'].value_counts().reset_index()
-                persona_counts.columns = ['Persona', 'Count']
+                persona_counts = view.counts_by(['Persona'], sentiment_filter)
                 fig_p = px.pie(persona_counts, names='Persona', values='Count', hole=0.4, title="Audience Breakdown")
                 st.plotly_chart(fig_p, use_container_width=True)
                 
@@ -504,18 +656,27 @@ def render_single_mode():
                     for i, row in requests_df.iterrows():
                         st.info(f"**{row['Author']}**: {row['Comment']}")
                 else: st.info("No requests found.")
+                
+                # Custom keyword sets
+                if 'Custom_Tags' in data_to_plot.columns:
+                    st.subheader("🏷️ Custom Keyword Sets")
+                    tag_counts = data_to_plot['Custom_Tags'].str.split(', ').explode()
+                    tag_counts = tag_counts[tag_counts != ''].value_counts()
+                    if not tag_counts.empty:
+                        st.bar_chart(tag_counts)
+                    else: st.info("No comments matched your keyword sets.")
 
         with tab5: # Community Hub
             col_q, col_gem = st.columns(2)
             with col_q:
                 st.subheader("❓ Unanswered Questions")
-                q_df = data_to_plot[(data_to_plot['Is_Question'] == True) & (data_to_plot['Reply_Count'] == 0)]
+                q_df = data_to_plot[(data_to_plot['Is_Question'] == True) & logic.unanswered(data_to_plot)]
                 if not q_df.empty:
                     for i, r in q_df.iterrows(): st.write(f"**{r['Author']}**: {r['Comment']}")
                 else: st.success("No unanswered questions!")
             with col_gem:
                 st.subheader("💎 Hidden Gems")
-                g_df = data_to_plot[(data_to_plot['Sentiment'] == 'Positive') & (data_to_plot['Reply_Count'] == 0)]
+                g_df = data_to_plot[(data_to_plot['Sentiment'] == 'Positive') & logic.unanswered(data_to_plot)]
                 if not g_df.empty:
                     for i, r in g_df.iterrows(): st.caption(f"**{r['Author']}**: {r['Comment']}")
 
@@ -528,17 +689,37 @@ def render_single_mode():
 
         with tab7: # Raw Data
             st.dataframe(data_to_plot)
-            csv = data_to_plot.to_csv(index=False).encode('utf-8')
-            st.download_button("Download CSV", csv, "sentiment.csv", "text/csv")
+            with st.expander("🧠 Memory used by this session's data"):
+                st.dataframe(logic.memory_report(processed_data), hide_index=True)
+            
+            # Exports are built on request (in chunks), then cached for this dataset + filter
+            if not data_to_plot.empty:
+                exports = get_export_cache()
+                fmt = st.selectbox("Export format", list(export.FORMATS), key="export_format")
+                export_bytes = exports.get(filter_key, fmt)
+                if export_bytes is None and st.button(f"Prepare {fmt} export"):
+                    with st.spinner("Exporting..."):
+                        export_bytes = exports.build(filter_key, data_to_plot, fmt)
+                if export_bytes is not None:
+                    ext, mime = export.FORMATS[fmt]
+                    st.download_button(f"Download {fmt.upper()}", export_bytes, "sentiment" + ext, mime)
             
             # PDF Report Download
             st.markdown("---")
             st.subheader("📄 Download Report")
             
-            # Generate PDF on the fly for the download button
+            # Built only on request, then cached for this dataset + filter
             if not data_to_plot.empty:
-                pdf_bytes = logic.generate_pdf_report(data_to_plot)
-                st.download_button("Download PDF Report 📄", pdf_bytes, "sentiment_report.pdf", "application/pdf")
+                reports = get_report_cache()
+                # The PDF is built in memory: comment lists are capped per section
+                max_rows = st.select_slider("Comments per report section", options=report.ROW_LIMITS,
+                                            value=report.MAX_ROWS_PER_SECTION, key="report_rows")
+                pdf_bytes = reports.get(filter_key, max_rows)
+                if pdf_bytes is None and st.button("Build PDF Report 📄"):
+                    with st.spinner("Writing report..."):
+                        pdf_bytes = reports.build(filter_key, data_to_plot, max_rows=max_rows)
+                if pdf_bytes is not None:
+                    st.download_button("Download PDF Report 📄", pdf_bytes, "sentiment_report.pdf", "application/pdf")
             else:
                 st.warning("No data to generate report.")
                 
@@ -547,8 +728,10 @@ def render_single_mode():
             st.info("Ask questions about the comments! (e.g., 'What do they say about the audio quality?')")
             
             user_query = st.text_input("Ask a question:", key="rag_query")
+            top_k = st.slider("Number of results", 1, 20, search.DEFAULT_TOP_K, key="rag_top_k")
             if user_query:
-                results = logic.query_dataframe(data_to_plot, user_query)
+                rag_index = get_search_index(processed_data, st.session_state.get('single_fp'))
+                results = logic.query_dataframe(data_to_plot, user_query, top_k=top_k, index=rag_index)
                 if results:
                     st.markdown(f"**Found {len(results)} relevant comments:**")
                     for author, comment, score in results:
@@ -578,16 +761,16 @@ def render_battle_mode():
             st.warning("Please enter both URLs.")
         else:
             with st.spinner("Analyzing both videos..."):
-                # Fetch
-                raw_a = helper.fetch_comments(url_a)
-                raw_b = helper.fetch_comments(url_b)
+                # Fetch + Process both videos at once
+                battle = pipeline.analyze_videos([url_a, url_b], get_shared_worker(), cache=analysis_cache,
+                                                 history=history_index)
+                df_a, df_b = battle[url_a], battle[url_b]
+                if df_a is df_b and not isinstance(df_b, dict):
+                    df_b = df_a.copy() # Same video twice
                 
-                if isinstance(raw_a, dict) or isinstance(raw_b, dict):
+                if isinstance(df_a, dict) or isinstance(df_b, dict):
                     st.error("Error fetching one of the videos. Check links/API quota.")
                 else:
-                    # Process
-                    df_a = logic.process_data_deep_learning(raw_a, roberta_model)
-                    df_b = logic.process_data_deep_learning(raw_b, roberta_model)
                     
                     # --- 1. KEY METRICS COMPARISON ---
                     st.markdown("## 🥊 Tale of the Tape")
@@ -602,6 +785,7 @@ def render_battle_mode():
                         toxic = len(df[df['Is_Toxic']==True])
                         return pos_pct, likes, replies, requests, toxic
 
+                    import plotly.express as px
                     m_a = get_metrics(df_a)
                     m_b = get_metrics(df_b)
                     
@@ -706,7 +890,7 @@ def render_battle_mode():
                     
                     with sz2:
                         st.subheader("❓ Unanswered Questions (Market Gap)")
-                        ua_b = df_b[(df_b['Is_Question']==True) & (df_b['Reply_Count']==0)]
+                        ua_b = df_b[(df_b['Is_Question']==True) & logic.unanswered(df_b)]
                         if not ua_b.empty:
                             st.write("Your competitor hasn't answered these. **You should!**")
                             for i, row in ua_b.head(5).iterrows():
@@ -776,18 +960,28 @@ def render_channel_mode():
                 
             st.success(f"Found {len(videos)} recent videos. Analyzing sentiment...")
             
-            # Analyze each video
+            # Analyze all videos concurrently
             results = []
             progress_bar = st.progress(0)
+            status_box = st.empty()
+            status_lines = []
+            titles = {vid['url']: vid['title'] for vid in videos}
             
-            for i, vid in enumerate(videos):
-                # Fetch comments
-                raw = helper.fetch_comments(vid['url'])
-                if isinstance(raw, dict): continue # Skip errors
-                if raw.empty: continue
-                
-                # Analyze
-                processed = logic.process_data_deep_learning(raw, roberta_model)
+            def on_video_done(url, processed, done, total):
+                if isinstance(processed, dict):
+                    status_lines.append(f"❌ {titles[url]}: {processed['error']}")
+                else:
+                    status_lines.append(f"✅ {titles[url]} ({len(processed)} comments)")
+                status_box.markdown("  \n".join(status_lines))
+                progress_bar.progress(done / total)
+            
+            analyzed = pipeline.analyze_videos(titles.keys(), get_shared_worker(), cache=analysis_cache,
+                                               on_progress=on_video_done, history=history_index)
+            
+            for vid in videos:
+                processed = analyzed[vid['url']]
+                if isinstance(processed, dict): continue # Skip errors
+                if processed.empty: continue
                 
                 # Metrics
                 pos_pct = len(processed[processed['Sentiment']=='Positive']) / len(processed) * 100
@@ -801,7 +995,6 @@ def render_channel_mode():
                     "Likes": likes,
                     "Replies": replies
                 })
-                progress_bar.progress((i + 1) / len(videos))
             
             if not results:
                 st.error("No data collected.")
@@ -838,6 +1031,7 @@ def render_channel_mode():
             st.markdown("<div style='margin: 30px 0;'></div>", unsafe_allow_html=True)
             
             # 1. Sentiment Trend
+            import plotly.express as px
             st.subheader("😊 Sentiment Consistency")
             fig_sent = px.line(trend_df, x='Published', y='Positivity', markers=True, 
                              title="Positivity % Over Last 5 Videos",
@@ -856,10 +1050,59 @@ def render_channel_mode():
             with st.expander("View Raw Stats"):
                 st.dataframe(trend_df)
 
+# --- HISTORY SEARCH MODE ---
+def render_history_mode():
+    st.markdown("""
+    <div style='text-align: center; margin-bottom: 2rem;'>
+        <h1 style='font-size: 3rem; margin-bottom: 0.5rem;'>🔎 Search Every Video</h1>
+        <p style='font-size: 1.1rem; color: #cbd5e1; margin: 0;'>
+            Ask across all comments you have ever analyzed
+        </p>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.caption(f"{len(history_index):,} comments indexed.")
+    query = st.text_input("Search:", placeholder="What do people say about the audio?", key="history_query")
+    
+    f1, f2, f3 = st.columns(3)
+    with f1:
+        video_ids = st.multiselect("Videos", history_index.videos())
+    with f2:
+        sentiments = st.multiselect("Sentiment", ["Positive", "Negative", "Neutral"])
+    with f3:
+        date_range = st.date_input("Published between", value=())
+    top_k = st.slider("Max results", 5, 200, 20)
+    
+    if query:
+        since, until = (None, None)
+        if len(date_range) == 2:
+            since, until = date_range[0], pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)
+        results = history_index.search(query, top_k=top_k, video_ids=video_ids, since=since,
+                                       until=until, sentiments=sentiments)
+        if results.empty:
+            st.warning("No matching comments.")
+        else:
+            st.markdown(f"**Found {len(results)} matching comments:**")
+            st.dataframe(results, hide_index=True)
+
+def render_session_memory():
+    # Every DataFrame this session holds (they stay in server memory between reruns)
+    frames = {k: v for k, v in st.session_state.items() if isinstance(v, pd.DataFrame)}
+    if frames:
+        total = sum(df.memory_usage(deep=True).sum() for df in frames.values())
+        # Aggregate cubes: their cells and keyword masks (rows are shared with the frame above)
+        cubes = [c for c in (st.session_state.get('cubes') or {}).get('by_keyword', {}).values() if c is not None]
+        total += sum(c.memory_bytes() for c in cubes)
+        st.sidebar.caption(f"🧠 Session data: {total / 1e6:.1f} MB in {len(frames)} table(s), {len(cubes)} cube(s)")
+
 # --- MAIN APP LOGIC ---
 if app_mode == "Single Video Analysis":
     render_single_mode()
 elif app_mode == "⚔️ Battle Mode":
     render_battle_mode()
+elif app_mode == "📈 Channel Trends":
+    render_channel_mode()
 else:
-    render_channel_mode()
\ No newline at end of file
+    render_history_mode()
+
+render_session_memory()
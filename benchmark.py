@@ -0,0 +1,205 @@
+"""
+Throughput benchmarks for the analysis pipeline (CPU).
+Run: python benchmark.py
+"""
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+import logic
+
+# Short / medium / long comments, roughly the mix we see on real videos
+SAMPLE_COMMENTS = [
+    "first",
+    "Great video! 🔥🔥",
+    "Can you make a video on React hooks?",
+    "This is the worst tutorial I've ever watched, the audio is terrible.",
+    "How did you get the lighting so clean in the intro? Would love a breakdown.",
+    "lol",
+    "I've been following this channel for three years now and every single upload "
+    "gets better. The editing, the pacing, the research, all of it. Keep going! ❤️",
+    "Why does the code at 4:32 not compile for me? I copied it exactly.",
+    "meh",
+    "Amazing work as always, thanks for sharing this with us!",
+]
+
+# Fixed hand-labeled sample for backend accuracy checks
+LABELED_SAMPLE = [
+    ("This is the best explanation I've found anywhere, thank you!", "Positive"),
+    ("Absolutely loved the editing in this one 🔥", "Positive"),
+    ("You just saved my exam, legend", "Positive"),
+    ("Great content as always, keep it up", "Positive"),
+    ("This made my day 😂❤️", "Positive"),
+    ("Super helpful, subscribed!", "Positive"),
+    ("Finally someone who explains it clearly", "Positive"),
+    ("Beautiful shots, what camera do you use? Amazing quality", "Positive"),
+    ("Worst video on this topic, total waste of time", "Negative"),
+    ("The audio is terrible, I can't hear anything", "Negative"),
+    ("Clickbait title, nothing in the video matches it", "Negative"),
+    ("This is wrong and misleading, please take it down", "Negative"),
+    ("So boring, I fell asleep halfway", "Negative"),
+    ("Unsubscribed. The quality dropped so much", "Negative"),
+    ("Stop shouting into the mic, it's annoying", "Negative"),
+    ("Your code doesn't even work, did you test it?", "Negative"),
+    ("What software is this?", "Neutral"),
+    ("Uploaded at 3pm my time", "Neutral"),
+    ("Part 2 is on the channel page", "Neutral"),
+    ("Which version of python is used here?", "Neutral"),
+    ("Watching this in 2024", "Neutral"),
+    ("The timestamp for the setup is 4:10", "Neutral"),
+    ("Is there a transcript available?", "Neutral"),
+    ("He mentioned this in the previous episode", "Neutral"),
+]
+
+def synthetic_comments(n, seed=0):
+    """
+    Builds N comments by sampling (and sometimes repeating) the sample set.
+    """
+    rng = random.Random(seed)
+    comments = []
+    for _ in range(n):
+        text = rng.choice(SAMPLE_COMMENTS)
+        if rng.random() < 0.3:
+            text = " ".join([text] * rng.randint(2, 4))
+        comments.append(text)
+    return comments
+
+def timed(fn, *args, **kwargs):
+    """
+    Runs fn once and returns (result, seconds).
+    """
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+def bench_inference(n=256, batch_sizes=(8, 16, 32, 64)):
+    """
+    Row-by-row analyze_roberta vs batched analyze_roberta_batch.
+    """
+    model = logic.load_bert_model()
+    texts = synthetic_comments(n)
+
+    # Warm-up (first call pays for lazy init)
+    logic.analyze_roberta_batch(texts[:8], model)
+
+    rows, row_time = timed(lambda: [logic.analyze_roberta(t, model) for t in texts])
+    print(f"{'mode':<16}{'seconds':>10}{'comments/s':>14}{'speedup':>10}")
+    print(f"{'row-by-row':<16}{row_time:>10.2f}{n / row_time:>14.1f}{1.0:>10.2f}")
+
+    for bs in batch_sizes:
+        batched, t = timed(logic.analyze_roberta_batch, texts, model, bs)
+        same = sum(a[0] == b[0] for a, b in zip(rows, batched)) / n * 100
+        print(f"{'batch=' + str(bs):<16}{t:>10.2f}{n / t:>14.1f}{row_time / t:>10.2f}   ({same:.0f}% same labels)")
+
+def bench_backends(backends=logic.BACKENDS, repeats=5):
+    """
+    Accuracy vs latency for each model backend on LABELED_SAMPLE.
+    Agreement is measured against the fp32 PyTorch labels.
+    """
+    texts = [t for t, _ in LABELED_SAMPLE]
+    labels = [l for _, l in LABELED_SAMPLE]
+    reference = None
+
+    print(f"{'backend':<10}{'load s':>8}{'ms/comment':>12}{'accuracy':>10}{'agree fp32':>12}")
+    for backend in backends:
+        try:
+            model, load_time = timed(logic.load_bert_model, backend)
+        except Exception as e:
+            print(f"{backend:<10} skipped: {e}")
+            continue
+        logic.analyze_roberta_batch(texts, model)  # warm-up
+
+        _, t = timed(lambda: [logic.analyze_roberta_batch(texts, model) for _ in range(repeats)])
+        predicted = [label for label, _ in logic.analyze_roberta_batch(texts, model)]
+        if backend == "pytorch":
+            reference = predicted
+
+        accuracy = sum(p == l for p, l in zip(predicted, labels)) / len(labels) * 100
+        agree = "-" if reference is None else f"{sum(p == r for p, r in zip(predicted, reference)) / len(texts) * 100:.0f}%"
+        ms = t / (repeats * len(texts)) * 1000
+        print(f"{backend:<10}{load_time:>8.1f}{ms:>12.2f}{accuracy:>9.0f}%{agree:>12}")
+
+def synthetic_frame(n, seed=0):
+    """
+    Synthetic scored comments (random Sentiment/Confidence, no model needed).
+    """
+    rng = np.random.default_rng(seed)
+    extras = ["", " http://example.com/watch", " <b>bold</b>", " 😂😂", " ?"]
+    comments = [c + extras[i % len(extras)] for i, c in enumerate(synthetic_comments(n, seed))]
+    return pd.DataFrame({
+        'Comment': comments,
+        'Sentiment': rng.choice(['Positive', 'Negative', 'Neutral'], size=n),
+        'Confidence': rng.uniform(0.4, 1.0, size=n),
+    })
+
+def features_row_by_row(df):
+    """
+    The original per-row feature stage (kept here as the baseline).
+    """
+    df['Clean_Text'] = df['Comment'].apply(logic.clean_text)
+    df['Emojis'] = df['Comment'].apply(logic.extract_emojis)
+    df['Is_Request'] = df['Clean_Text'].apply(logic.check_video_request)
+    df['Is_Question'] = df['Clean_Text'].apply(logic.is_question)
+    df['Is_Toxic'] = df.apply(lambda x: logic.is_toxic(x['Sentiment'], x['Confidence']), axis=1)
+    df['Persona'] = df.apply(logic.assign_persona, axis=1)
+    return df
+
+def features_vectorized(df):
+    df, hits = logic.extract_features(df)
+    return logic.assign_personas(df, hits=hits)
+
+def bench_features(n=100_000):
+    """
+    Per-row .apply feature stage vs the vectorized one.
+    """
+    base = synthetic_frame(n)
+    slow, slow_time = timed(features_row_by_row, base.copy())
+    fast, fast_time = timed(features_vectorized, base.copy())
+
+    columns = ['Clean_Text', 'Emojis', 'Is_Request', 'Is_Question', 'Is_Toxic', 'Persona']
+    mismatched = [c for c in columns if not (slow[c].astype(str) == fast[c].astype(str)).all()]
+    print(f"{n:,} comments: row-by-row {slow_time:.2f}s, vectorized {fast_time:.2f}s "
+          f"({slow_time / fast_time:.1f}x faster)")
+    print("Identical output" if not mismatched else f"Mismatched columns: {mismatched}")
+
+# What app.py imports before the first paint, and what it now defers
+APP_MODULES = ["streamlit", "helper", "logic", "cache", "pipeline", "search", "translate"]
+DEFERRED_MODULES = ["plotly.express", "wordcloud", "sklearn.feature_extraction.text",
+                    "googleapiclient.discovery", "transformers", "fpdf", "deep_translator"]
+
+def import_seconds(modules):
+    """
+    Cold import time of `modules` together, in a fresh interpreter.
+    Returns: Seconds, or None if one of them is not installed.
+    """
+    code = ("import time; start = time.perf_counter(); "
+            f"import {', '.join(modules)}; print(time.perf_counter() - start)")
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True)
+    return float(proc.stdout) if proc.returncode == 0 else None
+
+def bench_cold_start():
+    """
+    Import cost on the app's start path vs each module it now loads on demand.
+    """
+    installed = [m for m in APP_MODULES if import_seconds([m]) is not None]
+    print(f"{'module':<36}{'import s':>10}")
+    print(f"{'app start path (' + str(len(installed)) + ' modules)':<36}{import_seconds(installed):>10.2f}")
+    for module in DEFERRED_MODULES:
+        seconds = import_seconds([module])
+        print(f"{module:<36}{'not installed' if seconds is None else f'{seconds:.2f}':>10}")
+
+if __name__ == "__main__":
+    print("--- Cold start (imports) ---")
+    bench_cold_start()
+
+    print("\n--- Feature extraction (no model) ---")
+    bench_features()
+
+    print("\n--- Inference throughput (CPU) ---")
+    bench_inference()
+    print("\n--- Backends: accuracy vs latency ---")
+    bench_backends()
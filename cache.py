@@ -0,0 +1,150 @@
+"""
+On-disk cache of scored comments and per-video refresh state (SQLite).
+Scores are keyed by (comment_id, model_version) so a model change never serves stale scores.
+"""
+import io
+import os
+import sqlite3
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_DB_PATH = os.environ.get("YSA_CACHE_PATH", ".ysa_cache.sqlite")
+DEFAULT_TTL = 7 * 24 * 3600     # 1 week
+DEFAULT_MAX_ROWS = 500_000
+
+# SQLite caps the number of '?' parameters per statement
+_CHUNK = 500
+
+class AnalysisCache:
+    """
+    Stores Sentiment/Confidence per comment with TTL and size-based eviction.
+    Safe to share between Streamlit sessions (one connection, one lock).
+    """
+    def __init__(self, path=DEFAULT_DB_PATH, ttl=DEFAULT_TTL, max_rows=DEFAULT_MAX_ROWS):
+        self.path = path
+        self.ttl = ttl
+        self.max_rows = max_rows
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS scores (
+                    comment_id TEXT NOT NULL,
+                    model_version TEXT NOT NULL,
+                    sentiment TEXT NOT NULL,
+                    confidence REAL NOT NULL,
+                    scored_at REAL NOT NULL,
+                    PRIMARY KEY (comment_id, model_version)
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS scores_age ON scores (scored_at)")
+
+    def get_many(self, comment_ids, model_version):
+        """
+        Returns: Dict comment_id -> (Sentiment, Confidence) for fresh hits only.
+        """
+        comment_ids = list(dict.fromkeys(comment_ids))
+        cutoff = time.time() - self.ttl
+        hits = {}
+        with self.lock:
+            for i in range(0, len(comment_ids), _CHUNK):
+                chunk = comment_ids[i:i + _CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT comment_id, sentiment, confidence FROM scores "
+                    f"WHERE model_version = ? AND scored_at >= ? AND comment_id IN ({marks})",
+                    [model_version, cutoff, *chunk],
+                )
+                for cid, sentiment, confidence in rows:
+                    hits[cid] = (sentiment, confidence)
+        return hits
+
+    def put_many(self, scored, model_version):
+        """
+        Saves scores. `scored` is an iterable of (comment_id, Sentiment, Confidence).
+        """
+        now = time.time()
+        rows = [(cid, model_version, sent, float(conf), now) for cid, sent, conf in scored]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO scores VALUES (?, ?, ?, ?, ?)", rows)
+        self.evict()
+
+    def evict(self):
+        """
+        Drops expired rows, then the oldest rows above max_rows.
+        """
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM scores WHERE scored_at < ?", (time.time() - self.ttl,))
+            (count,) = self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()
+            if count > self.max_rows:
+                self.conn.execute(
+                    "DELETE FROM scores WHERE rowid IN "
+                    "(SELECT rowid FROM scores ORDER BY scored_at LIMIT ?)",
+                    (count - self.max_rows,),
+                )
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM scores").fetchone()[0]
+
+class VideoStore:
+    """
+    Last processed DataFrame per video, plus the refresh state:
+    newest Published_At seen, the page cursor where the first (full) fetch
+    stopped, and the cursor of an incremental fetch that hit its limit (gap_token).
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    newest_published TEXT,
+                    page_token TEXT,
+                    frame BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+            # Stores created before gap_token existed
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(videos)")]
+            if 'gap_token' not in columns:
+                self.conn.execute("ALTER TABLE videos ADD COLUMN gap_token TEXT")
+
+    def load(self, video_id):
+        """
+        Returns: Dict with 'frame', 'newest_published', 'page_token', 'gap_token',
+                 'updated_at', or None.
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT frame, newest_published, page_token, gap_token, updated_at FROM videos "
+                "WHERE video_id = ?",
+                (video_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        frame, newest, token, gap_token, updated = row
+        return {
+            'frame': pd.read_pickle(io.BytesIO(frame)),
+            'newest_published': newest,
+            'page_token': token,
+            'gap_token': gap_token,
+            'updated_at': updated,
+        }
+
+    def save(self, video_id, frame, newest_published=None, page_token=None, gap_token=None):
+        buffer = io.BytesIO()
+        frame.to_pickle(buffer)
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO videos "
+                "(video_id, newest_published, page_token, frame, updated_at, gap_token) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, newest_published, page_token, buffer.getvalue(), time.time(), gap_token),
+            )
@@ -0,0 +1,142 @@
+"""
+Pre-aggregated counts for the dashboard.
+AggregateCube groups a processed DataFrame ONCE by
+sentiment x persona x flags x time period; tiles and charts then sum a few
+hundred cells instead of rescanning every comment on each Streamlit rerun.
+Text aggregates (emojis, bi-grams) are computed on first use and memoized.
+"""
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import logic
+
+DIMENSIONS = ['Sentiment', 'Persona', 'Is_Question', 'Is_Request', 'Is_Toxic', 'Unanswered', 'Period']
+# Comments spanning up to this long are bucketed by hour, longer spans by day
+HOURLY_SPAN = pd.Timedelta(days=3)
+
+def period_freq(published):
+    """
+    Time bucket for the comments' span: 'h' (a fresh video) or 'D'.
+    """
+    published = pd.to_datetime(published)
+    span = published.max() - published.min()
+    return 'h' if pd.isna(span) or span <= HOURLY_SPAN else 'D'
+
+class AggregateCube:
+    """
+    Usage: cube = AggregateCube(df, fingerprint); cube.totals(["Positive"])
+    Every query takes the sentiment filter (None = all sentiments).
+    `mask` (boolean, e.g. a keyword filter) restricts the cube to some rows
+    without keeping a copy of them: the cube holds the frame and the mask.
+    The time bucket (`freq`) is picked from the whole frame's span.
+    """
+    def __init__(self, df, fingerprint=None, mask=None):
+        self.fingerprint = fingerprint
+        self.df = df
+        self.mask = None if mask is None else np.asarray(mask, dtype=bool)
+        self.memo = {}
+
+        published = df['Published_At'] if 'Published_At' in df.columns else pd.Series(pd.NaT, index=df.index)
+        self.freq = period_freq(published)
+        rows = df if self.mask is None else df[self.mask]
+        published = published if self.mask is None else published[self.mask]
+        keys = pd.DataFrame({
+            'Sentiment': rows['Sentiment'],
+            'Persona': rows['Persona'],
+            'Is_Question': rows['Is_Question'].astype(bool),
+            'Is_Request': rows['Is_Request'].astype(bool),
+            'Is_Toxic': rows['Is_Toxic'].astype(bool),
+            'Unanswered': logic.unanswered(rows),
+            'Period': pd.to_datetime(published).dt.floor(self.freq),
+            'Likes': rows['Likes'],
+        })
+        self.cells = (keys.groupby(DIMENSIONS, observed=True, dropna=False)
+                      .agg(Comments=('Likes', 'size'), Likes=('Likes', 'sum'))
+                      .reset_index())
+
+    def memory_bytes(self):
+        """
+        Memory held by the cube itself (cells + mask; the frame is shared).
+        """
+        return int(self.cells.memory_usage(deep=True).sum()) + (0 if self.mask is None else self.mask.nbytes)
+
+    def select(self, sentiments=None):
+        """
+        Cells of the chosen sentiments.
+        """
+        if sentiments is None:
+            return self.cells
+        return self.cells[self.cells['Sentiment'].isin(list(sentiments))]
+
+    def totals(self, sentiments=None):
+        """
+        Returns: Dict of counts for the KPI tiles.
+        """
+        cells = self.select(sentiments)
+        comments = cells['Comments']
+        by_sentiment = comments.groupby(cells['Sentiment'], observed=False).sum()
+        return {
+            'total': int(comments.sum()),
+            'likes': int(cells['Likes'].sum()),
+            'toxic': int(comments[cells['Is_Toxic']].sum()),
+            'requests': int(comments[cells['Is_Request']].sum()),
+            'unanswered_questions': int(comments[cells['Is_Question'] & cells['Unanswered']].sum()),
+            **{s: int(by_sentiment.get(s, 0)) for s in logic.SENTIMENTS},
+        }
+
+    def counts_by(self, dimensions, sentiments=None):
+        """
+        Comment counts grouped by `dimensions` (e.g. ['Persona'] or ['Period', 'Sentiment']).
+        Returns: DataFrame (*dimensions, Count) without empty groups.
+        """
+        cells = self.select(sentiments)
+        counts = cells.groupby(dimensions, observed=True)['Comments'].sum()
+        return counts[counts > 0].rename('Count').reset_index()
+
+    def trust_score(self, sentiments=None):
+        t = self.totals(sentiments)
+        return logic.trust_score(t['total'], t['toxic'], t['Negative'], t['likes'])
+
+    def summary(self):
+        """
+        Executive summary of the whole dataset (same text as generate_smart_summary).
+        """
+        t = self.totals()
+        return logic.summary_text(t['total'], t['Positive'], t['Negative'], t['unanswered_questions'],
+                                  self.bigrams())
+
+    def rows(self, sentiments=None):
+        """
+        Comments in the cube of the chosen sentiments (a fresh slice, not stored).
+        """
+        keep = np.ones(len(self.df), dtype=bool) if self.mask is None else self.mask
+        if sentiments is not None:
+            keep = keep & self.df['Sentiment'].isin(list(sentiments)).to_numpy()
+        return self.df if keep.all() else self.df[keep]
+
+    def bigrams(self, sentiments=None):
+        """
+        Top bi-grams of the chosen sentiments (memoized per filter).
+        """
+        key = ('bigrams', None if sentiments is None else tuple(sorted(sentiments)))
+        if key not in self.memo:
+            self.memo[key] = logic.extract_bigrams(self.rows(sentiments)['Clean_Text'].dropna())
+        return self.memo[key]
+
+    def emoji_counts(self, sentiments=None, top=10):
+        """
+        Most common emojis. Counted once per sentiment, then merged for the filter.
+        """
+        if 'emojis' not in self.memo:
+            per_sentiment = {}
+            rows = self.rows()
+            for sentiment, emojis in rows.groupby('Sentiment', observed=True)['Emojis']:
+                per_sentiment[sentiment] = Counter(char for text in emojis.dropna() for char in text)
+            self.memo['emojis'] = per_sentiment
+        merged = Counter()
+        for sentiment, counts in self.memo['emojis'].items():
+            if sentiments is None or sentiment in sentiments:
+                merged.update(counts)
+        return merged.most_common(top)
@@ -0,0 +1,96 @@
+"""
+Duplicate detection before model scoring.
+Exact duplicates: normalized text hashed with pandas (vectorized).
+Near duplicates (optional): MinHash signatures + LSH banding.
+"""
+import zlib
+
+import numpy as np
+import pandas as pd
+
+# MinHash parameters: 32 hashes in 8 bands of 4 rows
+NUM_PERM = 32
+BAND_ROWS = 4
+SHINGLE_SIZE = 5
+NEAR_DUP_THRESHOLD = 0.8
+_PRIME = (1 << 31) - 1
+
+def normalize_texts(texts):
+    """
+    Casefold, trim and collapse whitespace so trivial variants hash the same.
+    """
+    return (pd.Series(list(texts), dtype=object).astype(str)
+            .str.casefold()
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+def minhash_signatures(texts, num_perm=NUM_PERM, shingle=SHINGLE_SIZE, seed=1):
+    """
+    MinHash signature per text over character shingles.
+    Returns: Array of shape (len(texts), num_perm).
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, _PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, _PRIME, num_perm, dtype=np.uint64)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint64)
+    for i, text in enumerate(texts):
+        shingles = {text[j:j + shingle] for j in range(max(1, len(text) - shingle + 1))}
+        hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), dtype=np.uint64)
+        signatures[i] = ((np.outer(hashes, a) + b) % _PRIME).min(axis=0)
+    return signatures
+
+def near_duplicate_groups(texts, threshold=NEAR_DUP_THRESHOLD, band_rows=BAND_ROWS):
+    """
+    Groups texts whose estimated Jaccard similarity is >= threshold.
+    Returns: Array with the representative (first) index of each text's group.
+    """
+    n = len(texts)
+    parent = np.arange(n)
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    if n < 2:
+        return parent
+    signatures = minhash_signatures(texts)
+
+    # Texts sharing any band are candidates; confirm on the full signature
+    for start in range(0, signatures.shape[1], band_rows):
+        buckets = {}
+        for i, band in enumerate(signatures[:, start:start + band_rows]):
+            buckets.setdefault(band.tobytes(), []).append(i)
+        for members in buckets.values():
+            for j in members[1:]:
+                ri, rj = find(members[0]), find(j)
+                if ri != rj and (signatures[ri] == signatures[rj]).mean() >= threshold:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    return np.array([find(i) for i in range(n)])
+
+def duplicate_groups(texts, near=False, threshold=NEAR_DUP_THRESHOLD):
+    """
+    Maps every text to the position of its group's representative.
+    Returns: (representative position per text, positions of the representatives)
+    """
+    normalized = normalize_texts(texts)
+    keys = pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+    _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    representative = first[inverse]
+
+    # Near duplicates: cluster the exact-unique texts only
+    if near and len(first) > 1:
+        unique_texts = normalized.iloc[first].tolist()
+        merged = near_duplicate_groups(unique_texts, threshold=threshold)
+        representative = first[merged][inverse]
+
+    return representative, np.unique(representative)
+
+def dedup_stats(total, unique):
+    """
+    Summary of how much model work deduplication saved.
+    """
+    ratio = 1 - unique / total if total else 0.0
+    return {'rows': int(total), 'unique': int(unique), 'dedup_ratio': float(ratio)}
@@ -0,0 +1,127 @@
+"""
+Bulk export of processed comments: Parquet, gzip CSV, JSONL (and plain CSV).
+Frames are written in chunks of CHUNK_ROWS, so only one chunk is ever
+encoded at a time - to a file on disk (headless jobs) or to an in-memory
+buffer (app download, cached per dataset/filter).
+"""
+import gzip
+import io
+import threading
+from collections import OrderedDict
+
+# format -> (file extension, MIME type)
+FORMATS = {
+    'parquet': ('.parquet', 'application/vnd.apache.parquet'),
+    'csv.gz': ('.csv.gz', 'application/gzip'),
+    'jsonl': ('.jsonl', 'application/x-ndjson'),
+    'csv': ('.csv', 'text/csv'),
+}
+CHUNK_ROWS = 10_000
+CACHE_SIZE = 8
+
+def format_for_path(path):
+    """
+    Export format from the file name (e.g. out.csv.gz -> 'csv.gz').
+    """
+    for fmt, (ext, _) in sorted(FORMATS.items(), key=lambda kv: -len(kv[1][0])):
+        if str(path).endswith(ext):
+            return fmt
+    raise ValueError(f"Unknown export format for '{path}'. Use one of: {', '.join(e for e, _ in FORMATS.values())}")
+
+class ExportWriter:
+    """
+    Appends frames to one export, chunk by chunk.
+    `target` is a path or a binary file object. Use as a context manager or call close().
+    """
+    def __init__(self, target, fmt=None):
+        self.fmt = fmt or format_for_path(target)
+        if self.fmt not in FORMATS:
+            raise ValueError(f"Unknown export format '{self.fmt}'. Choose from {list(FORMATS)}.")
+        self.owns_file = isinstance(target, (str, bytes)) or hasattr(target, '__fspath__')
+        self.file = open(target, 'wb') if self.owns_file else target
+        self.rows = 0
+        self.parquet = None
+        self.header = True
+        self.text = None
+        if self.fmt == 'csv.gz':
+            self.gzip = gzip.GzipFile(fileobj=self.file, mode='wb')
+            self.text = io.TextIOWrapper(self.gzip, encoding='utf-8', newline='')
+        elif self.fmt in ('csv', 'jsonl'):
+            self.text = io.TextIOWrapper(self.file, encoding='utf-8', newline='')
+
+    def write(self, df, chunk_rows=CHUNK_ROWS):
+        for start in range(0, len(df), chunk_rows):
+            self._write_chunk(df.iloc[start:start + chunk_rows])
+        return self
+
+    def _write_chunk(self, chunk):
+        chunk = chunk.copy(deep=False)
+        chunk.attrs = {}
+        if self.fmt == 'parquet':
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            if self.parquet is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                self.parquet = pq.ParquetWriter(self.file, table.schema)
+            else:
+                table = pa.Table.from_pandas(chunk, schema=self.parquet.schema, preserve_index=False)
+            self.parquet.write_table(table)
+        elif self.fmt == 'jsonl':
+            lines = chunk.to_json(orient='records', lines=True, date_format='iso', force_ascii=False)
+            self.text.write(lines if lines.endswith('\n') else lines + '\n')
+        else:
+            chunk.to_csv(self.text, header=self.header, index=False)
+            self.header = False
+        self.rows += len(chunk)
+
+    def close(self):
+        if self.parquet is not None:
+            self.parquet.close()
+        if self.text is not None:
+            self.text.flush()
+            self.text.detach()
+        if self.fmt == 'csv.gz':
+            self.gzip.close()
+        if self.owns_file:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def export_bytes(df, fmt, chunk_rows=CHUNK_ROWS):
+    """
+    Whole export in memory (for download buttons). Returns: bytes
+    """
+    buffer = io.BytesIO()
+    with ExportWriter(buffer, fmt) as writer:
+        writer.write(df, chunk_rows)
+    return buffer.getvalue()
+
+class ExportCache:
+    """
+    (data key, format) -> export bytes (small LRU). Exports are only built on build().
+    """
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.exports = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, fmt):
+        with self.lock:
+            if (key, fmt) in self.exports:
+                self.exports.move_to_end((key, fmt))
+            return self.exports.get((key, fmt))
+
+    def build(self, key, df, fmt):
+        cached = self.get(key, fmt)
+        if cached is not None:
+            return cached
+        data = export_bytes(df, fmt)
+        with self.lock:
+            self.exports[(key, fmt)] = data
+            while len(self.exports) > self.max_entries:
+                self.exports.popitem(last=False)
+        return data
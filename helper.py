@@ -1,13 +1,29 @@
-from googleapiclient.discovery import build
 from urllib.parse import urlparse, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import os
+import random
+import re
+import sys
+import threading
+import time
 import pandas as pd
-import streamlit as st
 
 # --- CONFIGURATION ---
-try:
-    API_KEY = st.secrets["api_key"]
-except:
-    API_KEY = "LOCAL_KEY_FOR_TESTING"
+def load_api_key():
+    """
+    API key from $YOUTUBE_API_KEY (headless runs), else Streamlit secrets.
+    Streamlit is only consulted if the app already imported it.
+    """
+    if os.environ.get("YOUTUBE_API_KEY"):
+        return os.environ["YOUTUBE_API_KEY"]
+    if "streamlit" in sys.modules:
+        try:
+            return sys.modules["streamlit"].secrets["api_key"]
+        except:
+            pass
+    return "LOCAL_KEY_FOR_TESTING"
+
+API_KEY = load_api_key()
 
 def get_video_id(url):
     """
@@ -25,57 +41,306 @@ def get_video_id(url):
     except:
         return None
 
-def fetch_comments(video_url):
+# Columns of the raw comments DataFrame (Parent_Id is None for top-level comments)
+COMMENT_COLUMNS = ['Author', 'Comment', 'Likes', 'Reply_Count', 'Published_At', 'Comment_Id', 'Parent_Id']
+
+# The API serves at most 100 comment threads (or replies) per page
+PAGE_SIZE = 100
+DEFAULT_MAX_COMMENTS = 1000
+
+# Reply ingestion (off unless max_replies > 0).
+# Cost per video: at most max_replies rows, and one request per
+# MAX_REPLIES_PER_THREAD replies of each expanded thread.
+DEFAULT_MAX_REPLIES = 500
+DEFAULT_MIN_REPLIES = 2
+MAX_REPLIES_PER_THREAD = 100
+REPLY_WORKERS = 4
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+# Rate limits and server errors are retried; anything else (bad id, comments disabled) is not
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+def get_youtube_client():
+    """
+    Builds the YouTube Data API client.
+    """
+    # Imported on first fetch, not at app start
+    from googleapiclient.discovery import build
+    return build("youtube", "v3", developerKey=API_KEY)
+
+def parse_comment_thread(item):
+    """
+    Flattens one commentThreads item into a row of COMMENT_COLUMNS.
+    """
+    top = item['snippet']['topLevelComment']
+    comment = top['snippet']
+    return [
+        comment['authorDisplayName'],
+        comment['textDisplay'],
+        comment['likeCount'],
+        item['snippet']['totalReplyCount'],
+        comment['publishedAt'],
+        top['id'],
+        None,
+    ]
+
+def parse_reply(item):
+    """
+    Flattens one comments().list item (a reply) into a row of COMMENT_COLUMNS.
+    """
+    reply = item['snippet']
+    return [
+        reply['authorDisplayName'],
+        reply['textDisplay'],
+        reply['likeCount'],
+        0,
+        reply['publishedAt'],
+        item['id'],
+        reply['parentId'],
+    ]
+
+def execute_with_retry(request, retries=MAX_RETRIES, backoff=None):
+    """
+    request.execute(), retried with exponential backoff (plus jitter) on
+    RETRY_STATUSES and on network errors (no HTTP status).
+    `backoff` is the first wait in seconds (default RETRY_BACKOFF).
+    """
+    backoff = RETRY_BACKOFF if backoff is None else backoff
+    for attempt in range(retries + 1):
+        try:
+            return request.execute()
+        except Exception as e:
+            status = getattr(getattr(e, 'resp', None), 'status', None)
+            if attempt == retries or (status is not None and int(status) not in RETRY_STATUSES):
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random() / 2))
+
+def iter_comment_pages(video_id, youtube=None, max_comments=DEFAULT_MAX_COMMENTS,
+                       time_budget=None, order="relevance", page_token=None, prefetch=True):
+    """
+    Generator over comment pages (one DataFrame per API page).
+    Follows nextPageToken until `max_comments` or `time_budget` (seconds) is hit.
+    With `prefetch`, the next page is requested in the background while the
+    caller works on the current one (turn it off if the caller may stop early,
+    so no quota is spent on a page nobody reads).
+    Each page carries its cursor in page.attrs['next_page_token'].
+    """
+    youtube = youtube or get_youtube_client()
+    started = time.monotonic()
+
+    def request_page(token, remaining):
+        return youtube.commentThreads().list(
+            part="snippet",
+            videoId=video_id,
+            maxResults=min(PAGE_SIZE, remaining),
+            order=order,
+            pageToken=token,
+        ).execute()
+
+    fetched = 0
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pending = pool.submit(request_page, page_token, max_comments)
+        while pending is not None:
+            response = pending.result()
+            rows = [parse_comment_thread(item) for item in response.get('items', [])]
+            rows = rows[:max_comments - fetched]
+            fetched += len(rows)
+
+            # Prefetch the next page before handing this one over
+            next_token = response.get('nextPageToken')
+            pending = None
+            out_of_time = time_budget is not None and time.monotonic() - started >= time_budget
+            has_more = next_token and fetched < max_comments and not out_of_time
+            if has_more and prefetch:
+                pending = pool.submit(request_page, next_token, max_comments - fetched)
+
+            page = pd.DataFrame(rows, columns=COMMENT_COLUMNS)
+            page.attrs['next_page_token'] = next_token
+            yield page
+
+            if has_more and not prefetch:
+                pending = pool.submit(request_page, next_token, max_comments - fetched)
+
+def plan_replies(threads, max_replies=DEFAULT_MAX_REPLIES, min_replies=DEFAULT_MIN_REPLIES,
+                 max_per_thread=MAX_REPLIES_PER_THREAD):
+    """
+    Picks the threads to expand: most replies first, at least `min_replies`
+    each, until `max_replies` replies are allotted.
+    Returns: List of (parent comment id, replies to fetch)
+    """
+    top = threads[threads['Parent_Id'].isna()] if 'Parent_Id' in threads.columns else threads
+    counts = pd.to_numeric(top['Reply_Count'], errors='coerce').fillna(0)
+    candidates = top.loc[counts >= max(min_replies, 1), 'Comment_Id']
+    order = counts[candidates.index].sort_values(ascending=False, kind='stable')
+
+    plan, budget = [], max_replies
+    for parent_id, count in zip(candidates[order.index], order):
+        if budget <= 0:
+            break
+        n = min(int(count), max_per_thread, budget)
+        plan.append((parent_id, n))
+        budget -= n
+    return plan
+
+def fetch_thread_replies(youtube, parent_id, limit, retries=MAX_RETRIES):
+    """
+    Up to `limit` replies of one thread, following pagination.
+    Returns: List of rows (COMMENT_COLUMNS)
+    """
+    rows, token = [], None
+    while len(rows) < limit:
+        response = execute_with_retry(youtube.comments().list(
+            part="snippet",
+            parentId=parent_id,
+            maxResults=min(PAGE_SIZE, limit - len(rows)),
+            pageToken=token,
+        ), retries=retries)
+        rows.extend(parse_reply(item) for item in response.get('items', []))
+        token = response.get('nextPageToken')
+        if not token:
+            break
+    return rows[:limit]
+
+def fetch_replies(threads, youtube=None, max_replies=DEFAULT_MAX_REPLIES, min_replies=DEFAULT_MIN_REPLIES,
+                  max_per_thread=MAX_REPLIES_PER_THREAD, workers=REPLY_WORKERS, retries=MAX_RETRIES):
     """
-    Connects to YouTube API and fetches the top 100 comments.
+    Reply rows for the busiest threads of `threads` (see plan_replies),
+    fetched by a pool of `workers`. A thread that still fails after
+    `retries` is skipped; the others are kept.
+    Returns: DataFrame of COMMENT_COLUMNS (Parent_Id = thread's Comment_Id),
+             with attrs['reply_stats'] = {'threads', 'failed', 'replies'}
+    """
+    plan = plan_replies(threads, max_replies, min_replies, max_per_thread)
+    stats = {'threads': len(plan), 'failed': 0, 'replies': 0}
+    if not plan:
+        replies = pd.DataFrame(columns=COMMENT_COLUMNS)
+        replies.attrs['reply_stats'] = stats
+        return replies
+
+    # API clients are not thread-safe: one per worker unless a client was given
+    local = threading.local()
+    def fetch(parent_id, limit):
+        client = youtube
+        if client is None:
+            if not hasattr(local, 'youtube'):
+                local.youtube = get_youtube_client()
+            client = local.youtube
+        return fetch_thread_replies(client, parent_id, limit, retries)
+
+    rows = []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plan)))) as pool:
+        futures = [pool.submit(fetch, parent_id, limit) for parent_id, limit in plan]
+        # Collected in plan order, so the output does not depend on timing
+        for future in futures:
+            try:
+                rows.extend(future.result())
+            except Exception:
+                stats['failed'] += 1
+
+    replies = pd.DataFrame(rows, columns=COMMENT_COLUMNS)
+    stats['replies'] = len(replies)
+    replies.attrs['reply_stats'] = stats
+    return replies
+
+def fetch_comments(video_url, max_comments=DEFAULT_MAX_COMMENTS, time_budget=None, youtube=None,
+                   order="relevance", max_replies=0, **reply_kwargs):
+    """
+    Connects to YouTube API and fetches up to `max_comments` comments,
+    following pagination (see iter_comment_pages).
+    With `max_replies`, also fetches up to that many replies (see fetch_replies).
     """
     video_id = get_video_id(video_url)
     
     if not video_id:
         return {"error": "Invalid YouTube URL"}
 
+    pages = []
     try:
-        # 1. Connect to YouTube
-        youtube = build("youtube", "v3", developerKey=API_KEY)
+        # 'order=relevance' gets the 'top' comments first (most likely to be interesting)
+        for page in iter_comment_pages(video_id, youtube=youtube, max_comments=max_comments,
+                                       time_budget=time_budget, order=order):
+            pages.append(page)
+    except Exception as e:
+        # Keep what we already have if a later page fails
+        if not pages:
+            return {"error": str(e)}
 
-        # 2. Request Comments
-        # 'snippet' contains the text, author, and likes
-        request = youtube.commentThreads().list(
-            part="snippet",
-            videoId=video_id,
-            maxResults=100,  # Grab 100 comments
-            order="relevance" # Get the 'top' comments (most likely to be interesting)
-        )
-        response = request.execute()
+    if not pages:
+        return pd.DataFrame(columns=COMMENT_COLUMNS)
+    comments = pd.concat(pages, ignore_index=True)
+    if max_replies > 0:
+        replies = fetch_replies(comments, youtube=youtube, max_replies=max_replies, **reply_kwargs)
+        if not replies.empty:
+            comments = pd.concat([comments, replies], ignore_index=True)
+        comments.attrs['reply_stats'] = replies.attrs['reply_stats']
+    return comments
 
-        # 3. Process the JSON response into a list
-        comments_data = []
-        for item in response['items']:
-            comment = item['snippet']['topLevelComment']['snippet']
-            text = comment['textDisplay']
-            author = comment['authorDisplayName']
-            likes = comment['likeCount']
-            replies = item['snippet']['totalReplyCount']
-            published = comment['publishedAt']
-            
-            comments_data.append([author, text, likes, replies, published])
+def fetch_new_comments(video_id, known_ids, since=None, youtube=None, max_comments=DEFAULT_MAX_COMMENTS,
+                       page_token=None, stop_at_seen=True):
+    """
+    Incremental fetch: walks comments newest-first (order="time") and stops at
+    the first comment we already have (by id) or anything older than `since`.
+    To resume an interrupted fetch, pass its `page_token` and stop_at_seen=False:
+    known comments are then skipped and only `since` ends the walk.
+    Returns: DataFrame of new comments only (quota scales with new comments).
+             attrs['next_page_token'] is the cursor to resume from when
+             `max_comments` was hit before the walk ended, else None.
+    """
+    known_ids = set(known_ids)
+    since = pd.Timestamp(since) if since is not None else None
+    new_pages = []
+    next_token = None
 
-        # 4. Return as DataFrame
-        df = pd.DataFrame(comments_data, columns=['Author', 'Comment', 'Likes', 'Reply_Count', 'Published_At'])
-        return df
+    for page in iter_comment_pages(video_id, youtube=youtube, max_comments=max_comments,
+                                   order="time", page_token=page_token, prefetch=False):
+        published = pd.to_datetime(page['Published_At'])
+        known = page['Comment_Id'].isin(known_ids)
+        stop = known if stop_at_seen else pd.Series(False, index=page.index)
+        if since is not None:
+            stop |= published < since
+        if stop.any():
+            # Newest-first, so everything after the first stop row is old too
+            page = page.iloc[:int(stop.to_numpy().argmax())]
+            new_pages.append(page[~known[page.index]])
+            next_token = None
+            break
+        new_pages.append(page[~known])
+        next_token = page.attrs['next_page_token']
 
-    except Exception as e:
-        return {"error": str(e)}
+    new = pd.concat(new_pages, ignore_index=True) if new_pages else pd.DataFrame(columns=COMMENT_COLUMNS)
+    new.attrs['next_page_token'] = next_token
+    return new
+
+CHANNEL_ID_RE = re.compile(r"^UC[\w-]{22}$")
 
-def get_channel_id(video_url):
+def get_channel_id(url, youtube=None):
     """
-    Finds the Channel ID from a video URL.
+    Finds the Channel ID from a channel URL (/channel/UC..., /@handle, /user/name),
+    a bare channel ID or @handle, or a video URL from that channel.
+    Custom /c/ URLs can't be resolved through the API (returns None).
     """
-    video_id = get_video_id(video_url)
-    if not video_id: return None
-    
+    url = str(url).strip()
+    if CHANNEL_ID_RE.match(url):
+        return url
+    parts = [p for p in urlparse(url if "://" in url else "https://www.youtube.com/" + url).path.split("/") if p]
+
     try:
-        youtube = build("youtube", "v3", developerKey=API_KEY)
+        # 1. The ID is in the URL
+        if len(parts) >= 2 and parts[0] == "channel":
+            return parts[1]
+
+        # 2. Handles and legacy usernames: one channels() lookup
+        youtube = youtube or get_youtube_client()
+        if parts and parts[0].startswith("@"):
+            response = youtube.channels().list(part="id", forHandle=parts[0]).execute()
+            return response['items'][0]['id']
+        if len(parts) >= 2 and parts[0] == "user":
+            response = youtube.channels().list(part="id", forUsername=parts[1]).execute()
+            return response['items'][0]['id']
+
+        # 3. A video from the channel
+        video_id = get_video_id(url)
+        if not video_id: return None
         request = youtube.videos().list(part="snippet", id=video_id)
         response = request.execute()
         return response['items'][0]['snippet']['channelId']
@@ -88,7 +353,7 @@ def fetch_channel_videos(channel_id, limit=5):
     Returns: List of tuples (video_url, title, published_at)
     """
     try:
-        youtube = build("youtube", "v3", developerKey=API_KEY)
+        youtube = get_youtube_client()
         
         # 1. Get Uploads Playlist ID
         ch_req = youtube.channels().list(part="contentDetails", id=channel_id)
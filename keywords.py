@@ -0,0 +1,103 @@
+"""
+Multi-pattern keyword matching.
+All keyword lists are compiled into ONE trie-shaped regex, so a single pass
+over a comment finds every category that matched. Matching cost grows with
+the keyword length (trie depth), not with the number of keywords.
+"""
+import re
+
+import numpy as np
+import pandas as pd
+
+def trie_regex(keywords):
+    """
+    Builds a regex from a keyword trie, e.g. [how, help, hate] -> h(?:ow|elp|ate).
+    Longer keywords are preferred at each position (greedy optional suffixes).
+    """
+    trie = {}
+    for word in keywords:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def to_regex(node):
+        end = '' in node
+        branches = [re.escape(ch) + to_regex(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if end:
+            # Keyword may stop here, but try the longer ones first
+            return '(?:' + body + ')?'
+        return body
+
+    return to_regex(trie)
+
+class KeywordMatcher:
+    """
+    Substring keyword matcher over named categories (same semantics as `k in text`).
+    Usage: KeywordMatcher({'fan': ['love', 'best'], 'hater': ['worst']}).match("i love it")
+    """
+    def __init__(self, categories=None):
+        self.categories = {}
+        for name, keywords in (categories or {}).items():
+            self.categories[name] = sorted({k.lower() for k in keywords if k})
+        self._build()
+
+    def add(self, category, keywords):
+        """
+        Adds (or extends) a keyword set and recompiles once.
+        """
+        merged = set(self.categories.get(category, [])) | {k.lower() for k in keywords if k}
+        self.categories[category] = sorted(merged)
+        self._build()
+        return self
+
+    def _build(self):
+        owners = {}
+        for name, keywords in self.categories.items():
+            for k in keywords:
+                owners.setdefault(k, set()).add(name)
+
+        # The regex reports the longest keyword at each position; every shorter
+        # keyword starting there is a prefix of it, so it inherits their categories.
+        self.keyword_categories = {}
+        for k in owners:
+            cats = set()
+            for i in range(1, len(k) + 1):
+                cats |= owners.get(k[:i], set())
+            self.keyword_categories[k] = tuple(sorted(cats))
+
+        body = trie_regex(owners) if owners else r'(?!)'
+        # Zero-width lookahead so overlapping keywords are all seen
+        self.pattern = re.compile('(?=(' + body + '))')
+
+    def match(self, text):
+        """
+        Returns: Set of categories whose keywords occur in text.
+        """
+        found = set()
+        for m in self.pattern.finditer(str(text).lower()):
+            found.update(self.keyword_categories[m.group(1)])
+        return found
+
+    def match_frame(self, texts):
+        """
+        Vectorized match over a Series of (already lowercased) texts.
+        Returns: Boolean DataFrame, one column per category, same index as texts.
+        """
+        texts = pd.Series(texts)
+        result = pd.DataFrame(False, index=texts.index, columns=list(self.categories))
+        if texts.empty or not self.categories:
+            return result
+
+        # One findall per text, then map matched keywords -> categories
+        found = pd.Series(texts.to_numpy(), dtype=object).str.findall(self.pattern).explode().dropna()
+        cats = found.map(self.keyword_categories).explode().dropna()
+        rows = cats.index.to_numpy()
+        for name in self.categories:
+            hit = np.zeros(len(texts), dtype=bool)
+            hit[rows[(cats == name).to_numpy()]] = True
+            result[name] = hit
+        return result
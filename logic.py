@@ -1,16 +1,73 @@
 import pandas as pd
+import numpy as np
+import os
 import re
+import queue
+import threading
 import emoji
-from transformers import pipeline
-from sklearn.feature_extraction.text import CountVectorizer
+from keywords import KeywordMatcher
+from dedup import duplicate_groups, dedup_stats
+from topics import TOPICS
 
 # Load the Deep Learning pipeline (RoBERTa - optimized for social media)
 # We use @st.cache_resource in app.py later to make sure this only loads once!
-def load_bert_model():
-    model_path = "cardiffnlp/twitter-roberta-base-sentiment"
-    sentiment_task = pipeline("sentiment-analysis", model=model_path, tokenizer=model_path)
+MODEL_PATH = "cardiffnlp/twitter-roberta-base-sentiment"
+
+# Bump when anything that changes the scores changes (used as the cache key)
+# ':windows': long comments scored in token windows (was a 512-character cut)
+MODEL_VERSION = f"{MODEL_PATH}:windows"
+
+# CPU backends: full precision, dynamic int8 quantization, ONNX Runtime
+BACKENDS = ["pytorch", "int8", "onnx"]
+DEFAULT_BACKEND = os.environ.get("YSA_MODEL_BACKEND", "pytorch")
+ONNX_EXPORT_DIR = os.path.join(".onnx", MODEL_PATH.replace("/", "--"))
+
+def load_bert_model(backend=DEFAULT_BACKEND):
+    """
+    Loads the sentiment pipeline on the chosen backend.
+    All backends return a HuggingFace pipeline, so analyze_roberta works the same.
+    """
+    # Imported here so headless jobs only pay for transformers when they score
+    from transformers import pipeline
+
+    model_path = MODEL_PATH
+    if backend == "pytorch":
+        sentiment_task = pipeline("sentiment-analysis", model=model_path, tokenizer=model_path)
+    elif backend == "int8":
+        # Quantize the Linear layers to int8 (weights), activations stay fp32
+        import torch
+        from transformers import AutoModelForSequenceClassification, AutoTokenizer
+        model = AutoModelForSequenceClassification.from_pretrained(model_path)
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        sentiment_task = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    elif backend == "onnx":
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError:
+            raise ImportError("The ONNX backend needs: pip install optimum[onnxruntime]")
+        from transformers import AutoTokenizer
+        # Export once, then reuse the exported graph
+        if os.path.isdir(ONNX_EXPORT_DIR):
+            model = ORTModelForSequenceClassification.from_pretrained(ONNX_EXPORT_DIR)
+        else:
+            model = ORTModelForSequenceClassification.from_pretrained(model_path, export=True)
+            model.save_pretrained(ONNX_EXPORT_DIR)
+        tokenizer = AutoTokenizer.from_pretrained(model_path)
+        sentiment_task = pipeline("sentiment-analysis", model=model, tokenizer=tokenizer)
+    else:
+        raise ValueError(f"Unknown backend '{backend}'. Choose from {BACKENDS}.")
+
+    # Scores differ slightly per backend, so they get their own cache entries
+    sentiment_task.model_version = MODEL_VERSION if backend == "pytorch" else f"{MODEL_VERSION}:{backend}"
     return sentiment_task
 
+def model_version(model):
+    """
+    Cache key for the scores produced by `model`.
+    """
+    return getattr(model, 'model_version', MODEL_VERSION)
+
 def clean_text(text):
     """
     Minimal cleaning. Deep Learning models actually LIKE emojis and punctuation
@@ -29,22 +86,77 @@ def extract_emojis(text):
     """
     return ''.join(c for c in text if c in emoji.EMOJI_DATA)
 
+# Keyword lists shared by the row-wise helpers and the vectorized feature stage
+REQUEST_KEYWORDS = ["make a video", "do a video", "tutorial on", "please make", "next video", "can you", "could you", "requesting"]
+QUESTION_STARTS = ("how", "what", "why", "when", "can", "is", "do")
+FAN_KEYWORDS = ['love', 'best', 'awesome', 'amazing', 'great', 'fan']
+HATER_KEYWORDS = ['worst', 'bad', 'trash', 'garbage', 'stupid', 'hate']
+LEARNER_KEYWORDS = ['how', 'why', 'help']
+
+# Built-in keyword categories (creators can add their own, see build_keyword_matcher)
+BUILTIN_KEYWORD_SETS = {
+    'request': REQUEST_KEYWORDS,
+    'fan': FAN_KEYWORDS,
+    'hater': HATER_KEYWORDS,
+    'learner': LEARNER_KEYWORDS,
+}
+KEYWORD_MATCHER = KeywordMatcher(BUILTIN_KEYWORD_SETS)
+
+def build_keyword_matcher(custom_sets=None):
+    """
+    Matcher for the built-in categories plus custom ones ({name: [keywords]}).
+    Everything is compiled into one pattern, so extra sets don't add extra passes.
+    """
+    if not custom_sets:
+        return KEYWORD_MATCHER
+    return KeywordMatcher({**BUILTIN_KEYWORD_SETS, **custom_sets})
+
+def parse_keyword_sets(text):
+    """
+    Parses "name: kw1, kw2" lines into {name: [kw1, kw2]}.
+    """
+    sets = {}
+    for line in str(text).splitlines():
+        if ':' not in line:
+            continue
+        name, words = line.split(':', 1)
+        keywords = [w.strip() for w in words.split(',') if w.strip()]
+        if name.strip() and keywords:
+            sets[name.strip()] = keywords
+    return sets
+
+def char_ranges(chars):
+    """
+    Regex character-class body for a set of characters, collapsed into ranges
+    (a class of ~150 ranges matches far faster than ~1400 single characters).
+    """
+    ranges = []
+    for cp in sorted(ord(c) for c in chars):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return "".join(re.escape(chr(a)) + ("-" + re.escape(chr(b)) if b > a else "") for a, b in ranges)
+
+# Precompiled patterns for the vectorized feature stage
+LINK_RE = re.compile(r'http\S+')
+TAG_RE = re.compile(r'<[^>]+>')
+# All single-character emojis are non-ASCII, so ASCII is dropped first (cheap)
+ASCII_RE = re.compile(r'[\x00-\x7f]+')
+NON_EMOJI_RE = re.compile("[^" + char_ranges(c for c in emoji.EMOJI_DATA if len(c) == 1) + "]+")
+QUESTION_START_RE = re.compile(r"\s*(?:" + "|".join(QUESTION_STARTS) + ")")
+
 def check_video_request(text):
     """
     Heuristic to check if a comment is requesting a new video.
     """
-    text = text.lower()
-    keywords = ["make a video", "do a video", "tutorial on", "please make", "next video", "can you", "could you", "requesting"]
-    for k in keywords:
-        if k in text:
-            return True
-    return False
+    return 'request' in KEYWORD_MATCHER.match(text)
 
 def is_question(text):
     """
     Checks if the comment is a question.
     """
-    return "?" in text or text.strip().lower().startswith(("how", "what", "why", "when", "can", "is", "do"))
+    return "?" in text or text.strip().lower().startswith(QUESTION_STARTS)
 
 def is_toxic(sentiment, confidence):
     """
@@ -55,22 +167,23 @@ def is_toxic(sentiment, confidence):
 def extract_bigrams(text_list):
     """
     Extracts top 10 bi-grams (2-word phrases) using sklearn.
+    Goes through topics.TOPICS: sparse counts, memoized per set of texts.
     """
     try:
-        # Stop words 'english' removes common words like "the", "is", etc.
-        vectorizer = CountVectorizer(ngram_range=(2, 2), stop_words='english', max_features=10)
-        X = vectorizer.fit_transform(text_list)
-        
-        # Get counts
-        counts = X.toarray().sum(axis=0)
-        feature_names = vectorizer.get_feature_names_out()
-        
-        # Zip and sort
-        bigrams = sorted(zip(feature_names, counts), key=lambda x: x[1], reverse=True)
-        return bigrams
+        return TOPICS.top(text_list)
     except:
         return []
 
+def unanswered(df):
+    """
+    Top-level comments without replies (reply rows are never "unanswered").
+    Returns: Boolean Series
+    """
+    mask = df['Reply_Count'] == 0
+    if 'Parent_Id' in df.columns:
+        mask &= df['Parent_Id'].isna()
+    return mask
+
 def generate_smart_summary(df):
     """
     Generates a natural language executive summary based on the data.
@@ -81,7 +194,16 @@ def generate_smart_summary(df):
     total = len(df)
     positives = len(df[df['Sentiment'] == 'Positive'])
     negatives = len(df[df['Sentiment'] == 'Negative'])
-    neutrals = len(df[df['Sentiment'] == 'Neutral'])
+    questions = len(df[(df['Is_Question'] == True) & unanswered(df)])
+    bigrams = extract_bigrams(df['Clean_Text'].dropna())
+    return summary_text(total, positives, negatives, questions, bigrams)
+
+def summary_text(total, positives, negatives, questions, bigrams):
+    """
+    The executive summary from precomputed counts (see cube.AggregateCube).
+    """
+    if total == 0:
+        return "No data available for summary."
     
     pos_pct = (positives / total) * 100
     
@@ -100,15 +222,12 @@ def generate_smart_summary(df):
         action = "Engage more to understand the audience."
         
     # 2. Key Topics
-    bigrams = extract_bigrams(df['Clean_Text'].dropna())
     topics_str = ""
     if bigrams:
         top_3 = [b[0] for b in bigrams[:3]]
         topics_str = f"Viewers are discussing **'{', '.join(top_3)}'**."
         
     # 3. Unanswered
-    questions = len(df[(df['Is_Question'] == True) & (df['Reply_Count'] == 0)])
-    
     summary = f"""
     ### 📝 Executive Summary
     The overall response is **{vibe}** ({pos_pct:.1f}% Positive).
@@ -118,90 +237,431 @@ def generate_smart_summary(df):
     """
     return summary
 
+def map_roberta_label(label):
+    """
+    Maps RoBERTa labels to Human labels.
+    """
+    if label == 'LABEL_0':
+        return 'Negative'
+    elif label == 'LABEL_1':
+        return 'Neutral'
+    else:
+        return 'Positive'
+
 def analyze_roberta(text, model):
     """
     Uses the HuggingFace Transformer model.
     Returns: Label (Positive/Negative/Neutral) and Confidence Score.
     """
     try:
-        # Truncate text to 512 tokens (model limit)
-        result = model(text[:512])[0]
-        label = result['label']
-        score = result['score']
-        
-        # Map RoBERTa labels to Human labels
-        if label == 'LABEL_0':
-            return 'Negative', score
-        elif label == 'LABEL_1':
-            return 'Neutral', score
-        else:
-            return 'Positive', score
+        # Tokenizer-side truncation to the model limit (512 tokens)
+        result = model(text, truncation=True)[0]
+        return map_roberta_label(result['label']), result['score']
     except:
         return 'Neutral', 0.0
 
-def process_data_deep_learning(df, model):
+# Default number of comments per forward pass on CPU
+DEFAULT_BATCH_SIZE = 32
+
+# Long comments: overlapping token windows, at most MAX_WINDOWS per comment
+WINDOW_TOKENS = 510 # 512 minus <s> and </s>
+WINDOW_STRIDE = 384 # 126 tokens of overlap between neighbours
+MAX_WINDOWS = 4
+# A last window starting closer than this to the previous one replaces it
+WINDOW_MIN_STEP = 96
+
+def window_starts(n_tokens, window=WINDOW_TOKENS, stride=WINDOW_STRIDE, max_windows=MAX_WINDOWS):
+    """
+    Start offsets of the token windows covering a text of n_tokens.
+    Beyond max_windows the windows are spread evenly (first and last kept),
+    so a very long comment costs at most max_windows model inputs.
+    """
+    if n_tokens <= window:
+        return [0]
+    last = n_tokens - window
+    starts = list(range(0, last, stride))
+    # e.g. 900 tokens: [0, 390], not [0, 384, 390] (two near-identical windows)
+    if len(starts) > 1 and last - starts[-1] < WINDOW_MIN_STEP:
+        starts.pop()
+    starts.append(last)
+    if len(starts) > max_windows:
+        starts = np.linspace(0, last, max_windows).round().astype(int).tolist()
+    return starts
+
+def split_windows(texts, model):
+    """
+    Splits texts longer than the model limit into overlapping token windows.
+    Returns: (window texts, owner index per window, token count per window)
+    """
+    texts = [str(t) for t in texts]
+    try:
+        ids = model.tokenizer(texts, add_special_tokens=False)['input_ids']
+    except:
+        # No tokenizer: one window per text, the model truncates
+        return texts, list(range(len(texts))), [len(t) for t in texts]
+
+    windows, owners, lengths = [], [], []
+    for i, (text, tokens) in enumerate(zip(texts, ids)):
+        if len(tokens) <= WINDOW_TOKENS:
+            windows.append(text)
+            owners.append(i)
+            lengths.append(len(tokens))
+            continue
+        for start in window_starts(len(tokens)):
+            windows.append(model.tokenizer.decode(tokens[start:start + WINDOW_TOKENS]))
+            owners.append(i)
+            lengths.append(WINDOW_TOKENS)
+    return windows, owners, lengths
+
+def label_scores(output):
+    """
+    Pipeline output (all labels with top_k=None, or just the best) -> {label: score}
+    """
+    if isinstance(output, dict):
+        output = [output]
+    return {o['label']: o['score'] for o in output}
+
+def analyze_roberta_batch(texts, model, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Batched version of analyze_roberta.
+    Long comments are split into overlapping token windows; all windows go into
+    the same length-sorted batches as the short comments, and each comment's
+    label probabilities are averaged over its windows (weighted by tokens).
+    Returns: List of (Label, Confidence) in the same order as texts.
+    """
+    # Shared workers / remote models do their own batching
+    if hasattr(model, 'score_batch'):
+        return model.score_batch(list(texts))
+
+    results = [('Neutral', 0.0)] * len(texts)
+    if not len(texts):
+        return results
+
+    # 1. Tokenize once: short texts stay whole, long ones become windows
+    windows, owners, lengths = split_windows(texts, model)
+
+    # 2. Group by token length (shortest first) to cut padding, one forward pass per batch
+    order = sorted(range(len(windows)), key=lambda i: lengths[i])
+    probs = [None] * len(windows)
+    for start in range(0, len(order), batch_size):
+        batch_idx = order[start:start + batch_size]
+        batch = [windows[i] for i in batch_idx]
+        try:
+            outputs = model(batch, batch_size=len(batch), top_k=None, truncation=True)
+            for i, out in zip(batch_idx, outputs):
+                probs[i] = label_scores(out)
+        except:
+            # A single bad comment shouldn't sink the whole batch
+            for i in batch_idx:
+                try:
+                    probs[i] = label_scores(model([windows[i]], top_k=None, truncation=True)[0])
+                except:
+                    probs[i] = None
+
+    # 3. Token-weighted mean of the window probabilities per comment
+    totals = {}
+    for owner, p, weight in zip(owners, probs, lengths):
+        if p is None:
+            continue
+        acc, total_weight = totals.setdefault(owner, ({}, [0]))
+        weight = max(weight, 1)
+        for label, score in p.items():
+            acc[label] = acc.get(label, 0.0) + score * weight
+        total_weight[0] += weight
+    for owner, (acc, total_weight) in totals.items():
+        label = max(acc, key=acc.get)
+        results[owner] = (map_roberta_label(label), acc[label] / total_weight[0])
+
+    return results
+
+def score_with_cache(df, model, cache=None, batch_size=DEFAULT_BATCH_SIZE, dedup=True, near_duplicates=False,
+                     texts=None, version=None):
+    """
+    Scores df['Clean_Text'] (or `texts`), reusing cached scores by Comment_Id.
+    Only comments the cache has not seen go through the model, and with
+    `dedup` only one copy of each (near-)duplicate text is scored.
+    `version` overrides the cache key's model version (e.g. for translated text).
+    Returns: (List of (Label, Confidence) in row order, stats dict)
+    """
+    texts = df['Clean_Text'].tolist() if texts is None else list(texts)
+    use_cache = cache is not None and 'Comment_Id' in df.columns
+    ids = df['Comment_Id'].astype(str).tolist() if use_cache else []
+    version = version or model_version(model)
+    hits = cache.get_many(ids, version) if use_cache else {}
+
+    # Score the misses only
+    missing = [i for i, cid in enumerate(ids) if cid not in hits] if use_cache else list(range(len(texts)))
+    missing_texts = [texts[i] for i in missing]
+
+    # Broadcast one score per unique text back to every copy
+    if dedup and missing_texts:
+        representative, unique = duplicate_groups(missing_texts, near=near_duplicates)
+        unique_scores = analyze_roberta_batch([missing_texts[u] for u in unique], model, batch_size=batch_size)
+        by_representative = dict(zip(unique, unique_scores))
+        scored = [by_representative[r] for r in representative]
+    else:
+        unique = missing
+        scored = analyze_roberta_batch(missing_texts, model, batch_size=batch_size)
+
+    if use_cache:
+        cache.put_many([(ids[i], *res) for i, res in zip(missing, scored)], version)
+
+    stats = dedup_stats(len(missing), len(unique))
+    stats['cache_hits'] = len(hits)
+    fresh = dict(zip(missing, scored))
+    results = [fresh[i] if i in fresh else hits[ids[i]] for i in range(len(texts))]
+    return results, stats
+
+TRANSLATION_CHUNK = 200
+
+def translate_and_score(df, texts, model, translator, cache=None, batch_size=DEFAULT_BATCH_SIZE, dedup=True,
+                        near_duplicates=False, chunk_size=TRANSLATION_CHUNK):
+    """
+    Translation and scoring overlapped (producer/consumer): a background
+    thread translates chunk i+1 while the model scores chunk i, so enabling
+    translation costs roughly max(translate, score) instead of the sum.
+    Returns: (translated texts, List of (Label, Confidence), stats dict)
+    """
+    texts = list(texts)
+    chunks = queue.Queue(maxsize=2)
+    stop = threading.Event() # Set when the consumer is done (or failed)
+
+    def put(item):
+        # Gives up once the consumer stopped, so a full queue can't block forever
+        while not stop.is_set():
+            try:
+                chunks.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    # 1. Producer: translate chunk by chunk (a failed chunk stays untranslated)
+    def produce():
+        for start in range(0, len(texts), chunk_size):
+            if stop.is_set():
+                return
+            chunk = texts[start:start + chunk_size]
+            try:
+                translated, chunk_stats = translator.translate_many(chunk)
+                non_english = chunk_stats['non_english']
+            except Exception:
+                translated, non_english = chunk, 0
+            if not put((start, translated, non_english)):
+                return
+        put(None)
+
+    producer = threading.Thread(target=produce, name="translate-producer", daemon=True)
+    producer.start()
+
+    # 2. Consumer: score each chunk as soon as it is translated.
+    # Scores of translated text are cached apart from scores of the original.
+    version = f"{model_version(model)}+translated"
+    translated_texts, results = [], []
+    stats = {'rows': 0, 'unique': 0, 'cache_hits': 0, 'translated': 0}
+    try:
+        while (item := chunks.get()) is not None:
+            start, translated, non_english = item
+            part = df.iloc[start:start + len(translated)]
+            scored, part_stats = score_with_cache(part, model, cache=cache, batch_size=batch_size, dedup=dedup,
+                                                  near_duplicates=near_duplicates, texts=translated,
+                                                  version=version)
+            translated_texts.extend(translated)
+            results.extend(scored)
+            for key in ('rows', 'unique', 'cache_hits'):
+                stats[key] += part_stats[key]
+            stats['translated'] += non_english
+    finally:
+        # Also on errors (e.g. the model server is down): never leave the producer behind
+        stop.set()
+        producer.join()
+
+    stats['dedup_ratio'] = dedup_stats(stats['rows'], stats['unique'])['dedup_ratio']
+    return translated_texts, results, stats
+
+def strip_markup(comments):
+    """
+    Vectorized clean_text: links first, then HTML tags.
+    """
+    return comments.astype(str).str.replace(LINK_RE, '', regex=True).str.replace(TAG_RE, '', regex=True)
+
+def extract_features(df, matcher=KEYWORD_MATCHER, clean=None):
+    """
+    Vectorized text features (same output as clean_text / extract_emojis /
+    check_video_request / is_question applied row by row).
+    Pass `clean` to use already cleaned (e.g. translated) text for Clean_Text.
+    Adds: Clean_Text, Emojis, Is_Request, Is_Question
+    (+ Custom_Tags when the matcher has custom keyword sets)
+    Returns: (df, keyword hits) - the hits are reused by assign_personas.
+    """
+    comments = df['Comment'].astype(str)
+
+    clean = strip_markup(comments) if clean is None else pd.Series(list(clean), index=df.index, dtype=object)
+    lower = clean.str.lower()
+    hits = matcher.match_frame(lower)
+
+    df['Clean_Text'] = clean
+    df['Emojis'] = comments.str.replace(ASCII_RE, '', regex=True).str.replace(NON_EMOJI_RE, '', regex=True)
+    df['Is_Request'] = hits['request']
+    df['Is_Question'] = clean.str.contains('?', regex=False) | lower.str.match(QUESTION_START_RE)
+
+    custom = [c for c in hits.columns if c not in BUILTIN_KEYWORD_SETS]
+    if custom:
+        tags = hits[custom]
+        df['Custom_Tags'] = tags.apply(lambda col: np.where(col, col.name + ', ', '')).sum(axis=1).str.rstrip(', ')
+    return df, hits
+
+# Fixed label sets (categorical dtypes)
+SENTIMENTS = ['Positive', 'Negative', 'Neutral']
+PERSONAS = ["🏆 Super Fan", "🛑 Hater", "🎓 Learner", "👋 Casual"] # Rule order; the last is the default
+
+def assign_personas(df, matcher=KEYWORD_MATCHER, hits=None):
+    """
+    Vectorized toxicity flag and persona (same rules as is_toxic / assign_persona).
+    Adds: Is_Toxic, Persona
+    """
+    if hits is None:
+        hits = matcher.match_frame(df['Clean_Text'].str.lower())
+    positive = (df['Sentiment'] == 'Positive').to_numpy()
+    negative = (df['Sentiment'] == 'Negative').to_numpy()
+    confidence = df['Confidence'].to_numpy(dtype=float)
+
+    toxic = negative & (confidence > 0.90)
+    df['Is_Toxic'] = toxic
+
+    # First matching rule wins, same order as assign_persona
+    conditions = [
+        positive & ((confidence > 0.95) | hits['fan'].to_numpy()),
+        negative & (toxic | hits['hater'].to_numpy()),
+        df['Is_Question'].to_numpy(dtype=bool) | hits['learner'].to_numpy(),
+    ]
+    df['Persona'] = np.select(conditions, PERSONAS[:-1], default=PERSONAS[-1])
+    return df
+
+TEXT_COLUMNS = ['Author', 'Comment', 'Clean_Text', 'Emojis', 'Custom_Tags', 'Comment_Id', 'Parent_Id']
+COUNT_COLUMNS = ['Likes', 'Reply_Count']
+
+def string_dtype():
+    """
+    Arrow-backed strings when pyarrow is installed (one buffer per column
+    instead of one Python object per cell), else plain object.
+    Missing values stay NaN, as in object columns.
+    """
+    try:
+        import pyarrow # noqa: F401
+    except ImportError:
+        return object
+    try:
+        return pd.StringDtype("pyarrow", na_value=np.nan) # pandas >= 2.3
+    except TypeError:
+        pass
+    try:
+        return pd.StringDtype("pyarrow_numpy") # pandas 2.1 - 2.2
+    except (TypeError, ValueError):
+        return object
+
+def compact_frame(df):
+    """
+    Narrow dtypes for the processed frame (it is kept per session):
+    categorical labels, int32 counts, float32 confidence, Arrow strings.
+    """
+    if 'Sentiment' in df.columns:
+        df['Sentiment'] = pd.Categorical(df['Sentiment'], categories=SENTIMENTS)
+    if 'Persona' in df.columns:
+        df['Persona'] = pd.Categorical(df['Persona'], categories=PERSONAS)
+    if 'Confidence' in df.columns:
+        df['Confidence'] = df['Confidence'].astype('float32')
+    for col in COUNT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    text = string_dtype()
+    for col in TEXT_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(text)
+    return df
+
+def memory_report(df):
+    """
+    Deep memory use per column.
+    Returns: DataFrame (Column, Dtype, MB) sorted by size, plus a Total row.
+    """
+    usage = df.memory_usage(deep=True, index=True)
+    report = pd.DataFrame({
+        'Column': usage.index,
+        'Dtype': [str(df[c].dtype) if c in df.columns else 'index' for c in usage.index],
+        'MB': usage.to_numpy() / 1e6,
+    }).sort_values('MB', ascending=False)
+    total = pd.DataFrame({'Column': ['Total'], 'Dtype': [''], 'MB': [usage.sum() / 1e6]})
+    return pd.concat([report, total], ignore_index=True)
+
+def process_data_deep_learning(df, model, batch_size=DEFAULT_BATCH_SIZE, cache=None, matcher=KEYWORD_MATCHER,
+                               dedup=True, near_duplicates=False, translator=None):
     """
     Main Pipeline using Deep Learning
+    Pass an AnalysisCache (cache.py) to skip comments scored on a previous run,
+    and a matcher from build_keyword_matcher to tag custom keyword sets.
+    `dedup` scores each repeated text once (`near_duplicates` adds MinHash matching).
+    With a `translator` (translate.TranslationService) comments are translated to
+    English first, so scores, questions and personas all use the translated text.
     """
-    # 1. Clean
-    df['Clean_Text'] = df['Comment'].apply(clean_text)
-    
-    # 2. Extract Emojis (For the visualization feature)
-    df['Emojis'] = df['Comment'].apply(extract_emojis)
-    
-    # 3. New Creator Features
-    df['Is_Request'] = df['Clean_Text'].apply(check_video_request)
-    df['Is_Question'] = df['Clean_Text'].apply(is_question)
+    if translator is not None:
+        # 1-4. Translate + Analyze overlapped, then features on the translated text
+        clean, results, stats = translate_and_score(df, strip_markup(df['Comment']), model, translator,
+                                                    cache=cache, batch_size=batch_size, dedup=dedup,
+                                                    near_duplicates=near_duplicates)
+        df, hits = extract_features(df, matcher=matcher, clean=clean)
+    else:
+        # 1-3. Clean, Extract Emojis (For the visualization feature), Creator Features
+        # One keyword pass feeds both Is_Request and the personas
+        df, hits = extract_features(df, matcher=matcher)
+
+        # 4. Analyze (This takes time, so we show a progress bar in app.py usually)
+        # Batched: one forward pass per `batch_size` comments (cache hits are skipped)
+        results, stats = score_with_cache(df, model, cache=cache, batch_size=batch_size,
+                                          dedup=dedup, near_duplicates=near_duplicates)
     
     # Ensure Date is Datetime for Time Series
     if 'Published_At' in df.columns:
         df['Published_At'] = pd.to_datetime(df['Published_At'])
-    
-    # 4. Analyze (This takes time, so we show a progress bar in app.py usually)
-    # Applying the model row by row
-    results = df['Clean_Text'].apply(lambda x: analyze_roberta(x, model))
+    # How much model work the cache + dedup saved (shown in the app)
+    df.attrs['pipeline_stats'] = stats
     
     # Unpack results into two columns
     df['Sentiment'] = [res[0] for res in results]
     df['Confidence'] = [res[1] for res in results]
     
-    # 5. Toxicity Check
-    df['Is_Toxic'] = df.apply(lambda x: is_toxic(x['Sentiment'], x['Confidence']), axis=1)
-    
-    # 6. Persona Assignment
-    df['Persona'] = df.apply(assign_persona, axis=1)
+    # 5-6. Toxicity Check + Persona Assignment
+    df = assign_personas(df, hits=hits)
     
-    return df
+    # 7. Compact dtypes (the frame lives in session state)
+    return compact_frame(df)
 
 def assign_persona(row):
     """
     Classifies a user into a persona based on their comment.
     """
-    text = row['Clean_Text'].lower()
+    tags = KEYWORD_MATCHER.match(row['Clean_Text'])
     sent = row['Sentiment']
     conf = row['Confidence']
     is_q = row['Is_Question']
     is_tox = row['Is_Toxic']
     
     # 1. Super Fan: Positive + (keywords OR High Confidence)
-    fan_keywords = ['love', 'best', 'awesome', 'amazing', 'great', 'fan']
-    if sent == 'Positive' and (conf > 0.95 or any(k in text for k in fan_keywords)):
+    if sent == 'Positive' and (conf > 0.95 or 'fan' in tags):
         return "🏆 Super Fan"
     
     # 2. Hater: Negative + (Toxic OR keywords)
-    hater_keywords = ['worst', 'bad', 'trash', 'garbage', 'stupid', 'hate']
-    if sent == 'Negative' and (is_tox or any(k in text for k in hater_keywords)):
+    if sent == 'Negative' and (is_tox or 'hater' in tags):
         return "🛑 Hater"
         
     # 3. Learner: Questions
-    if is_q or any(k in text for k in ['how', 'why', 'help']):
+    if is_q or 'learner' in tags:
         return "🎓 Learner"
         
     # 4. Casual (Default)
     return "👋 Casual"
 
 # --- NEW FEATURES: SMART REPLY & PDF ---
-from fpdf import FPDF
 
 def generate_smart_reply(comment, persona, sentiment):
     """
@@ -238,124 +698,79 @@ def generate_smart_reply(comment, persona, sentiment):
 
 def generate_pdf_report(df):
     """
-    Generates a PDF analysis report.
+    Generates a PDF analysis report (multi-page, see report.py).
     Returns: Bytes of the PDF file.
     """
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    
-    # Title
-    pdf.set_font("Arial", "B", 16)
-    pdf.cell(200, 10, txt="AI YouTube Sentiment Report", ln=True, align='C')
-    pdf.ln(10)
-    
-    # Summary Metrics
-    pdf.set_font("Arial", size=12)
-    total = len(df)
-    pos = len(df[df['Sentiment']=='Positive'])
-    neg = len(df[df['Sentiment']=='Negative'])
-    
-    pdf.cell(200, 10, txt=f"Total Comments: {total}", ln=True)
-    pdf.cell(200, 10, txt=f"Positive: {pos} ({pos/total*100:.1f}%)", ln=True)
-    pdf.cell(200, 10, txt=f"Negative: {neg} ({neg/total*100:.1f}%)", ln=True)
-    pdf.ln(10)
-    
-    # Top Topics
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(200, 10, txt="Top Discussion Topics", ln=True)
-    pdf.set_font("Arial", size=12)
-    
-    bigrams = extract_bigrams(df['Clean_Text'])
-    for phrase, count in bigrams[:5]:
-        pdf.cell(200, 10, txt=f"- {phrase} ({count} mentions)", ln=True)
-        
-    pdf.ln(10)
-    
-    # Action Items
-    pdf.set_font("Arial", "B", 14)
-    pdf.cell(200, 10, txt="Action Items / Requests", ln=True)
-    pdf.set_font("Arial", size=12)
-    
-    reqs = df[df['Is_Request']==True]
-    if not reqs.empty:
-        for i, row in reqs.head(3).iterrows():
-            pdf.multi_cell(0, 10, txt=f"Request: {row['Comment'][:100]}...")
-    else:
-        pdf.cell(200, 10, txt="No specific requests found.", ln=True)
-        
-    # Return as string (Latin-1 encoding required for FPDF legacy)
-    return pdf.output(dest='S').encode('latin-1', 'ignore')
+    from report import build_report
+    return build_report(df)
 
 # --- GOD MODE LOGIC ---
-from deep_translator import GoogleTranslator
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import numpy as np
+from search import CommentIndex, DEFAULT_TOP_K
+from translate import TranslationService
 
 def calculate_trust_score(df):
     """
     Calculates a Brand Safety / Trust Score (0-100).
     """
     if df.empty: return 0
+    toxic_count = len(df[df['Is_Toxic']==True])
+    neg_count = len(df[df['Sentiment']=='Negative'])
+    return trust_score(len(df), toxic_count, neg_count, df['Likes'].sum())
+
+def trust_score(total, toxic_count, neg_count, total_likes):
+    """
+    Trust Score from precomputed counts (see cube.AggregateCube).
+    """
+    if total == 0: return 0
     
     # 1. Base Score
     score = 100
     
     # 2. Penalties
     # Toxicity Penalty
-    toxic_count = len(df[df['Is_Toxic']==True])
-    toxic_ratio = toxic_count / len(df)
+    toxic_ratio = toxic_count / total
     score -= (toxic_ratio * 100) * 1.5 # Heavy penalty for toxicity
     
     # Negativity Penalty
-    neg_count = len(df[df['Sentiment']=='Negative'])
-    neg_ratio = neg_count / len(df)
+    neg_ratio = neg_count / total
     score -= (neg_ratio * 100) * 0.5 # Moderate penalty for negativity
     
     # 3. Bonuses
     # Engagement Bonus (if highly liked/replied)
-    avg_likes = df['Likes'].mean()
+    avg_likes = total_likes / total
     if avg_likes > 10: score += 5
     
     return max(0, min(100, int(score)))
 
-def translate_comment(text):
+def translate_comment(text, service=None):
     """
     Translates a single text to English.
+    Goes through a TranslationService (translate.py): English text is skipped
+    and earlier translations come from the cache. For many texts, call
+    service.translate_many directly.
     """
     try:
-        # Check if text is likely not English (simple heuristic or just force translate)
-        # Deep Translator automatically detects language
-        return GoogleTranslator(source='auto', target='en').translate(text)
+        service = service or TranslationService()
+        return service.translate_many([text])[0][0]
     except:
         return text
 
-def query_dataframe(df, query):
+def dataset_fingerprint(df):
+    """
+    Cheap content hash of an analyzed DataFrame (used to key caches/indexes).
+    Covers every column, so export/report caches also see changed tags,
+    confidences or personas (e.g. a re-run with other custom keywords).
+    """
+    hashes = pd.util.hash_pandas_object(df, index=True)
+    return f"{len(df)}-{int(hashes.sum()) & 0xFFFFFFFFFFFFFFFF:016x}"
+
+def query_dataframe(df, query, top_k=DEFAULT_TOP_K, index=None):
     """
     RAG: Semantic Search over the dataframe.
+    Pass a prebuilt search.CommentIndex to skip refitting on every query.
     """
     try:
-        # Create Corpus
-        documents = df['Clean_Text'].fillna("").tolist()
-        documents.append(query)
-        
-        # TF-IDF Vectorization
-        tfidf = TfidfVectorizer(stop_words='english')
-        tfidf_matrix = tfidf.fit_transform(documents)
-        
-        # Compute Cosine Similarity
-        cosine_sim = cosine_similarity(tfidf_matrix[-1], tfidf_matrix[:-1])
-        
-        # Get Top 3 Matches
-        scores = cosine_sim[0]
-        top_indices = scores.argsort()[-3:][::-1]
-        
-        results = []
-        for idx in top_indices:
-            if scores[idx] > 0.1: # Threshold to match
-                results.append((df.iloc[idx]['Author'], df.iloc[idx]['Comment'], scores[idx]))
-        
-        return results
+        index = index or CommentIndex(df)
+        return index.query(query, top_k=top_k, mask=index.mask_for(df))
     except Exception as e:
-        return []
\ No newline at end of file
+        return []
@@ -0,0 +1,153 @@
+"""
+Local inference server: one warm model shared by every Streamlit worker.
+
+Run:
+    python model_server.py --port 8765 --backend int8
+    YSA_MODEL_SERVER=http://127.0.0.1:8765 streamlit run app.py
+
+The model is loaded and warmed up before the port opens. Requests from all
+sessions/processes go through one ModelWorker, so concurrent requests are
+merged into shared batches.
+
+API (JSON):
+    GET  /health -> {"status": "ok", "model_version": ...}
+    GET  /metrics -> scheduler queue depth and batch fill (pipeline.ModelWorker.metrics)
+    POST /score  {"texts": [...]} -> {"results": [[label, confidence], ...]}
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import logic
+import pipeline
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Set to the server URL to score remotely instead of loading a model per process
+MODEL_SERVER_URL = os.environ.get("YSA_MODEL_SERVER")
+# Texts per HTTP request (bounds request size, keeps the worker's batches flowing)
+REQUEST_CHUNK = 512
+
+WARMUP_TEXTS = ["Great video!", "This is the worst.", "What camera is this?"] * 11
+
+class RemoteModel:
+    """
+    Client for a running model server. Has score_batch and model_version,
+    so it can be passed anywhere a model is expected.
+    """
+    def __init__(self, url=MODEL_SERVER_URL, timeout=120):
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        # Fails fast if the server is down; scores are cached per server model
+        self.model_version = self._request("/health")["model_version"]
+
+    def _request(self, path, payload=None):
+        data = None if payload is None else json.dumps(payload).encode("utf-8")
+        request = urllib.request.Request(self.url + path, data=data,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())
+
+    def metrics(self):
+        return self._request("/metrics")
+
+    def score_batch(self, texts):
+        texts = [str(t) for t in texts]
+        results = []
+        for start in range(0, len(texts), REQUEST_CHUNK):
+            reply = self._request("/score", {"texts": texts[start:start + REQUEST_CHUNK]})
+            results.extend((label, score) for label, score in reply["results"])
+        return results
+
+def load_model(backend=logic.DEFAULT_BACKEND):
+    """
+    Remote model if YSA_MODEL_SERVER is set, else a local pipeline.
+    """
+    if MODEL_SERVER_URL:
+        return RemoteModel(MODEL_SERVER_URL)
+    return logic.load_bert_model(backend)
+
+def warm_up(model):
+    """
+    One throwaway batch so the first real request doesn't pay for lazy init.
+    Returns: Seconds spent.
+    """
+    start = time.perf_counter()
+    logic.analyze_roberta_batch(WARMUP_TEXTS, model)
+    return time.perf_counter() - start
+
+def make_handler(worker):
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            if self.path == "/health":
+                self._reply(200, {"status": "ok", "model_version": worker.model_version})
+            elif self.path == "/metrics":
+                self._reply(200, worker.metrics())
+            else:
+                self._reply(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/score":
+                self._reply(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                texts = json.loads(self.rfile.read(length))["texts"]
+            except Exception as e:
+                self._reply(400, {"error": f"bad request: {e}"})
+                return
+            try:
+                results = worker.score_batch(texts)
+            except Exception as e:
+                self._reply(500, {"error": str(e)})
+                return
+            self._reply(200, {"results": [list(r) for r in results]})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+def serve(model, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """
+    Serves `model` until interrupted. Each request runs in its own thread;
+    the shared ModelWorker merges whatever is queued at the same time.
+    """
+    worker = pipeline.ModelWorker(model)
+    server = ThreadingHTTPServer((host, port), make_handler(worker))
+    print(f"Model server ({worker.model_version}) on http://{host}:{port}", file=sys.stderr, flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        worker.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Shared sentiment model server")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--backend", choices=logic.BACKENDS, default=logic.DEFAULT_BACKEND)
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    model = logic.load_bert_model(args.backend)
+    print(f"Model loaded in {time.perf_counter() - started:.1f}s, warm-up {warm_up(model):.1f}s",
+          file=sys.stderr, flush=True)
+    serve(model, args.host, args.port)
+
+if __name__ == "__main__":
+    main()
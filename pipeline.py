@@ -0,0 +1,388 @@
+"""
+Orchestration on top of helper (fetching) and logic (scoring).
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import pandas as pd
+
+import helper
+import logic
+import topics
+
+# Scheduler defaults: texts per scheduling round, and how long the first
+# request of a round waits for others to join it
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_WAIT = 0.02
+
+class _Job:
+    """
+    One submit() call. Its texts are scheduled in slices of at most max_batch,
+    and the Future is resolved once every slice has been scored.
+    """
+    def __init__(self, texts, future):
+        self.texts = texts
+        self.future = future
+        self.results = [None] * len(texts)
+        self.next = 0 # First text not scheduled yet
+        self.done = 0
+        self.queued_at = time.monotonic()
+
+class ModelWorker:
+    """
+    One thread that owns the model and scores texts for many callers.
+    Requests from concurrent callers are gathered into one round until it holds
+    `max_batch` texts or `max_wait` seconds have passed since the round started,
+    then scored together and the results sent back to each caller's Future.
+    Large requests are split into `max_batch` slices and callers take turns
+    (round-robin), so a 5,000-comment video never holds up a small request
+    for more than one round.
+    Pass it anywhere a model is expected (logic checks for `score_batch`).
+    """
+    def __init__(self, model, batch_size=logic.DEFAULT_BATCH_SIZE, max_batch=DEFAULT_MAX_BATCH,
+                 max_wait=DEFAULT_MAX_WAIT):
+        self.model = model
+        self.model_version = logic.model_version(model)
+        self.batch_size = batch_size
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = queue.Queue()
+        self.active = deque() # Jobs with texts left to schedule (worker thread only)
+        self.closed = False
+        self.lock = threading.Lock()
+        self.queued_texts = 0
+        self.totals = {'rounds': 0, 'jobs': 0, 'texts': 0, 'fill': 0.0, 'wait': 0.0}
+        self.thread = threading.Thread(target=self._run, name="model-worker", daemon=True)
+        self.thread.start()
+
+    def submit(self, texts):
+        """
+        Queues texts for scoring. Returns: Future of a list of (Label, Confidence).
+        """
+        texts = list(texts)
+        future = Future()
+        if not texts:
+            future.set_result([])
+            return future
+        with self.lock:
+            self.queued_texts += len(texts)
+        self.queue.put(_Job(texts, future))
+        return future
+
+    def score_batch(self, texts):
+        return self.submit(texts).result()
+
+    def close(self):
+        self.queue.put(None)
+
+    def metrics(self):
+        """
+        Queue depth and how well rounds are filled.
+        batch_fill: mean share of max_batch used per round (1.0 = always full).
+        """
+        with self.lock:
+            totals = dict(self.totals)
+            queued_texts = self.queued_texts
+        rounds = totals['rounds'] or 1
+        return {
+            'queue_depth': self.queue.qsize() + len(self.active),
+            'queued_texts': queued_texts,
+            'rounds': totals['rounds'],
+            'avg_round_texts': totals['texts'] / rounds,
+            'avg_jobs_per_round': totals['jobs'] / rounds,
+            'batch_fill': totals['fill'] / rounds,
+            'avg_wait_ms': totals['wait'] / (totals['jobs'] or 1) * 1000,
+        }
+
+    def _next_round(self):
+        """
+        Returns: List of (job, start, end) slices holding at most max_batch texts,
+                 or None once closed and idle.
+        """
+        # 1. Wait for work
+        if not self.active:
+            job = None if self.closed else self.queue.get()
+            if job is None:
+                return None
+            self.active.append(job)
+
+        # 2. Gather concurrent requests until a full round is pending or the wait is over
+        deadline = time.monotonic() + self.max_wait
+        pending = sum(len(j.texts) - j.next for j in self.active)
+        arrived = []
+        while not self.closed:
+            timeout = deadline - time.monotonic() if pending < self.max_batch else 0
+            try:
+                job = self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:
+                self.closed = True
+                break
+            arrived.append(job)
+            pending += len(job.texts)
+        # Newcomers go ahead of jobs that already had a turn
+        self.active.extendleft(reversed(arrived))
+
+        # 3. Fill the round: one slice per job in turn; unfinished jobs go to the back
+        slices, size = [], 0
+        while self.active and size < self.max_batch:
+            job = self.active.popleft()
+            start = job.next
+            job.next = min(len(job.texts), start + self.max_batch - size)
+            slices.append((job, start, job.next))
+            size += job.next - start
+            if job.next < len(job.texts):
+                self.active.append(job)
+        return slices
+
+    def _run(self):
+        while True:
+            slices = self._next_round()
+            if slices is None:
+                return
+            self._score(slices)
+
+    def _score(self, slices):
+        texts = [t for job, start, end in slices for t in job.texts[start:end]]
+        jobs = list({id(job): job for job, _, _ in slices}.values())
+        now = time.monotonic()
+        with self.lock:
+            self.queued_texts -= len(texts)
+            self.totals['rounds'] += 1
+            self.totals['jobs'] += len(jobs)
+            self.totals['texts'] += len(texts)
+            self.totals['fill'] += min(len(texts) / self.max_batch, 1.0)
+            self.totals['wait'] += sum(now - job.queued_at for job in jobs)
+        try:
+            results = logic.analyze_roberta_batch(texts, self.model, batch_size=self.batch_size)
+        except Exception as e:
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+            # The rest of a failed job is not scored
+            failed = [job for job in self.active if job.future.done()]
+            for job in failed:
+                self.active.remove(job)
+                with self.lock:
+                    self.queued_texts -= len(job.texts) - job.next
+            return
+        pos = 0
+        for job, start, end in slices:
+            job.results[start:end] = results[pos:pos + end - start]
+            pos += end - start
+            job.done += end - start
+            if job.done == len(job.texts):
+                job.future.set_result(job.results)
+
+def score_pages(page_iter, model, cache=None, **process_kwargs):
+    """
+    Scores each page of comments as soon as it arrives. With a prefetching
+    page generator (helper.iter_comment_pages), page i+1 is fetched while
+    page i is scored, so fetch and model time overlap.
+    A failed fetch keeps the pages before it (it is raised if there are none).
+    Extra keyword arguments go to logic.process_data_deep_learning.
+    Returns: (List of raw pages, List of processed frames)
+    """
+    page_iter = iter(page_iter)
+    pages, frames = [], []
+    while True:
+        try:
+            page = next(page_iter)
+        except StopIteration:
+            break
+        except Exception:
+            # Keep what we already have if a later page fails
+            if not pages:
+                raise
+            break
+        pages.append(page)
+        if not page.empty:
+            frames.append(logic.process_data_deep_learning(page, model, cache=cache, **process_kwargs))
+    return pages, frames
+
+def combine_frames(frames):
+    """
+    One processed frame from per-page frames, with their pipeline stats summed.
+    """
+    if not frames:
+        return pd.DataFrame(columns=helper.COMMENT_COLUMNS)
+    stats = {}
+    for frame in frames:
+        for key, value in (frame.attrs.get('pipeline_stats') or {}).items():
+            if key != 'dedup_ratio':
+                stats[key] = stats.get(key, 0) + value
+    stats['dedup_ratio'] = logic.dedup_stats(stats.get('rows', 0), stats.get('unique', 0))['dedup_ratio']
+    combined = logic.compact_frame(pd.concat(frames, ignore_index=True))
+    combined.attrs['pipeline_stats'] = stats
+    return combined
+
+def analyze_video(video_url, model, cache=None, history=None, process_kwargs=None,
+                  max_comments=helper.DEFAULT_MAX_COMMENTS, time_budget=None, youtube=None, order="relevance",
+                  max_replies=0, **reply_kwargs):
+    """
+    Fetch + score one video (and add it to the search history, if given).
+    Pages are scored while the next one is fetched (see score_pages);
+    duplicates are therefore only merged within a page (the cache still
+    skips comments seen before). With `max_replies`, the busiest threads'
+    replies are fetched and scored last (see helper.fetch_replies).
+    `process_kwargs` go to logic.process_data_deep_learning.
+    Returns: Processed DataFrame or {"error": ...}
+    """
+    video_id = helper.get_video_id(video_url)
+    if not video_id:
+        return {"error": "Invalid YouTube URL"}
+    process_kwargs = process_kwargs or {}
+
+    try:
+        pages, frames = score_pages(helper.iter_comment_pages(video_id, youtube=youtube, max_comments=max_comments,
+                                                              time_budget=time_budget, order=order),
+                                    model, cache=cache, **process_kwargs)
+    except Exception as e:
+        return {"error": str(e)}
+
+    reply_stats = None
+    if max_replies > 0 and frames:
+        replies = helper.fetch_replies(pd.concat(pages, ignore_index=True), youtube=youtube,
+                                       max_replies=max_replies, **reply_kwargs)
+        reply_stats = replies.attrs['reply_stats']
+        if not replies.empty:
+            frames.append(logic.process_data_deep_learning(replies, model, cache=cache, **process_kwargs))
+
+    processed = combine_frames(frames)
+    if reply_stats is not None:
+        processed.attrs['reply_stats'] = reply_stats
+    if history is not None and not processed.empty:
+        history.add(video_id, processed)
+    return processed
+
+def analyze_videos(video_urls, model, cache=None, max_workers=5, on_progress=None, keep_results=True,
+                   history=None, **fetch_kwargs):
+    """
+    Fetches all videos at once (thread pool) and scores them through one
+    shared ModelWorker, so wall-clock time is close to the slowest video.
+    A failing video yields {"error": ...} and never blocks the others.
+    `on_progress(url, result, done, total)` is called from the calling thread.
+    With keep_results=False, frames are only handed to on_progress (streaming)
+    and the returned dict holds row counts instead.
+    Returns: Dict url -> processed DataFrame or {"error": ...}
+    """
+    video_urls = list(video_urls)
+    worker = model if hasattr(model, 'score_batch') else ModelWorker(model)
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(video_urls)))) as pool:
+            futures = {pool.submit(analyze_video, url, worker, cache, history, **fetch_kwargs): url
+                       for url in video_urls}
+            for future in as_completed(futures):
+                url = futures[future]
+                try:
+                    results[url] = future.result()
+                except Exception as e:
+                    results[url] = {"error": str(e)}
+                if on_progress:
+                    on_progress(url, results[url], len(results), len(video_urls))
+                if not keep_results and not isinstance(results[url], dict):
+                    results[url] = len(results[url])
+    finally:
+        if worker is not model:
+            worker.close()
+    return results
+
+def refresh_video(video_url, model, store, cache=None, youtube=None,
+                  max_comments=helper.DEFAULT_MAX_COMMENTS, backfill=0, history=None, **process_kwargs):
+    """
+    Incremental refresh for one video.
+    First run: fetches newest-first (order="time") up to `max_comments`,
+    scoring each page while the next one is fetched.
+    Later runs: fetches only comments newer than the stored ones, scores them
+    and merges them into the stored DataFrame. With `backfill`, also pulls up to
+    that many older comments from the cursor where the first run stopped.
+    If more than `max_comments` new comments arrived, the cursor where the
+    fetch stopped is stored (and the stored newest timestamp kept), and the
+    next run resumes from there before looking at newer comments.
+    Extra keyword arguments go to logic.process_data_deep_learning.
+    Returns: (DataFrame, number of new rows) or {"error": ...}
+             attrs['refresh_truncated'] is True while such a gap is left.
+    """
+    video_id = helper.get_video_id(video_url)
+    if not video_id:
+        return {"error": "Invalid YouTube URL"}
+
+    state = store.load(video_id)
+    old = state['frame'] if state else None
+    gap_token = None
+    scored = []
+    try:
+        if state is None:
+            first, scored = score_pages(helper.iter_comment_pages(video_id, youtube=youtube,
+                                                                  max_comments=max_comments, order="time"),
+                                        model, cache=cache, **process_kwargs)
+            page_token = first[-1].attrs['next_page_token'] if first else None
+            pages = []
+        else:
+            pages = []
+            budget = max_comments
+            # 1. Finish the fetch that hit the limit last time (down to the stored newest timestamp)
+            if state.get('gap_token'):
+                resumed = helper.fetch_new_comments(video_id, old['Comment_Id'], since=state['newest_published'],
+                                                    youtube=youtube, max_comments=budget,
+                                                    page_token=state['gap_token'], stop_at_seen=False)
+                pages.append(resumed)
+                budget -= len(resumed)
+                gap_token = resumed.attrs['next_page_token']
+            # 2. Comments newer than the stored ones (once no gap is left)
+            if gap_token is None and budget > 0:
+                latest = helper.fetch_new_comments(video_id, old['Comment_Id'], since=state['newest_published'],
+                                                   youtube=youtube, max_comments=budget)
+                pages.append(latest)
+                gap_token = latest.attrs['next_page_token']
+            page_token = state['page_token']
+
+        # Resume older comments from the stored cursor
+        if state is not None and backfill and page_token:
+            older = list(helper.iter_comment_pages(video_id, youtube=youtube, max_comments=backfill,
+                                                   order="time", page_token=page_token))
+            if older:
+                page_token = older[-1].attrs['next_page_token']
+                pages.extend(older)
+    except Exception as e:
+        return {"error": str(e)}
+
+    new = pd.concat(pages, ignore_index=True) if pages else pd.DataFrame(columns=helper.COMMENT_COLUMNS)
+    if old is not None:
+        new = new[~new['Comment_Id'].isin(old['Comment_Id'])]
+    new = new.drop_duplicates('Comment_Id').reset_index(drop=True)
+
+    # Model time scales with the new rows only
+    if not new.empty:
+        new = logic.process_data_deep_learning(new, model, cache=cache, **process_kwargs)
+    elif scored:
+        new = combine_frames(scored).drop_duplicates('Comment_Id', ignore_index=True)
+    if not new.empty:
+        if history is not None:
+            history.add(video_id, new)
+        # Topic counts too: old counts (memoized) + counts of the new comments
+        if old is not None and not old.empty:
+            topics.TOPICS.merge(old['Clean_Text'], new['Clean_Text'])
+
+    frames = [f for f in (new, old) if f is not None and not f.empty]
+    if not frames:
+        return new, 0
+    # Re-compact: stored frames from older runs may still hold object columns
+    merged = logic.compact_frame(pd.concat(frames, ignore_index=True))
+    merged.attrs['pipeline_stats'] = new.attrs.get('pipeline_stats')
+
+    merged.attrs['refresh_truncated'] = gap_token is not None
+
+    # With a gap left, keep the old newest timestamp: it is where the gap ends
+    if gap_token is not None:
+        newest = state['newest_published']
+    else:
+        newest = merged['Published_At'].max()
+        newest = newest.isoformat() if pd.notna(newest) else None
+    store.save(video_id, merged, newest, page_token, gap_token)
+    return merged, len(new)
@@ -0,0 +1,194 @@
+"""
+Multi-page PDF report, built only when asked for.
+1. Numbers and charts come from the aggregate cube (cube.py), topics from the
+   shared topic counts (topics.py) - no extra passes over the comments.
+2. Comment sections read only the needed columns. FPDF keeps the whole
+   document in memory until output(), so each section lists at most
+   `max_rows` comments (chosen in the app and stated in the report);
+   the full lists are in the data exports.
+3. ReportCache keeps the finished bytes per dataset/filter key and row limit.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import cube
+import logic
+
+MAX_ROWS_PER_SECTION = 500
+# Choices offered in the app (rows per comment section)
+ROW_LIMITS = (100, 500, 2000, 5000)
+PERSONA_ROWS = 25
+MAX_CHARS = 300
+MAX_BARS = 60
+CACHE_SIZE = 8
+
+SENTIMENT_COLORS = {'Positive': (16, 185, 129), 'Negative': (239, 68, 68), 'Neutral': (99, 102, 241)}
+BAR_COLOR = (99, 102, 241)
+
+def latin1(text, limit=None):
+    """
+    Core PDF fonts are Latin-1 only: drop what they can't draw (emojis etc).
+    """
+    text = str(text)
+    if limit and len(text) > limit:
+        text = text[:limit] + "..."
+    return text.encode('latin-1', 'ignore').decode('latin-1').strip()
+
+def heading(pdf, text, size=14):
+    pdf.set_font("Arial", "B", size)
+    pdf.cell(0, 10, txt=latin1(text), ln=True)
+    pdf.set_font("Arial", size=10)
+
+def bar_chart(pdf, title, labels, values, colors=None, height=45):
+    """
+    Horizontal-axis bar chart drawn with PDF rectangles (no image libraries).
+    """
+    heading(pdf, title, size=12)
+    if pdf.get_y() + height + 15 > pdf.h - pdf.b_margin:
+        pdf.add_page()
+    values = [float(v) for v in values]
+    top = max(values) if values and max(values) > 0 else 1.0
+    left, bottom = pdf.l_margin, pdf.get_y() + height
+    width = (pdf.w - pdf.l_margin - pdf.r_margin) / max(len(values), 1)
+    for i, (label, value) in enumerate(zip(labels, values)):
+        pdf.set_fill_color(*(colors[i] if colors else BAR_COLOR))
+        bar = height * value / top
+        pdf.rect(left + i * width + 1, bottom - bar, max(width - 2, 0.5), bar, 'F')
+    pdf.set_y(bottom + 1)
+    pdf.set_font("Arial", size=7)
+    if len(labels) <= 12:
+        for label, value in zip(labels, values):
+            pdf.cell(width, 4, txt=latin1(f"{label} ({value:,.0f})"), align='C')
+    else:
+        pdf.cell(0, 4, txt=latin1(f"{labels[0]}  ...  {labels[-1]}  (max {top:,.0f})"), align='C')
+    pdf.ln(10)
+
+def downsample(labels, values, max_bars=MAX_BARS):
+    """
+    Merges neighbouring buckets so at most max_bars are drawn.
+    """
+    if len(values) <= max_bars:
+        return list(labels), list(values)
+    chunks = np.array_split(np.arange(len(values)), max_bars)
+    values = np.asarray(values)
+    return [labels[c[0]] for c in chunks], [values[c].sum() for c in chunks]
+
+def comment_rows(pdf, rows, limit, empty_text):
+    """
+    Writes (Author, Comment, Likes) rows; notes how many were left out.
+    """
+    shown = 0
+    for row in rows.head(limit).itertuples(index=False):
+        pdf.multi_cell(0, 5, txt=latin1(f"{row.Author} ({row.Likes} likes): {row.Comment}", MAX_CHARS))
+        pdf.ln(1)
+        shown += 1
+    if shown == 0:
+        pdf.cell(0, 6, txt=empty_text, ln=True)
+    elif len(rows) > shown:
+        pdf.set_font("Arial", "I", 9)
+        pdf.cell(0, 6, txt=f"... and {len(rows) - shown:,} more (see the data export).", ln=True)
+        pdf.set_font("Arial", size=10)
+    pdf.ln(4)
+
+def build_report(df, view=None, max_rows=MAX_ROWS_PER_SECTION):
+    """
+    Generates the PDF analysis report.
+    Pass the dataset's AggregateCube as `view` to skip rebuilding it.
+    Returns: Bytes of the PDF file.
+    """
+    from fpdf import FPDF
+    view = view or cube.AggregateCube(df)
+    totals = view.totals()
+    total = totals['total'] or 1
+    cols = ['Author', 'Comment', 'Likes']
+
+    pdf = FPDF()
+    pdf.set_auto_page_break(True, margin=15)
+    pdf.add_page()
+
+    # 1. Title + Summary Metrics
+    pdf.set_font("Arial", "B", 16)
+    pdf.cell(0, 10, txt="AI YouTube Sentiment Report", ln=True, align='C')
+    pdf.ln(6)
+    pdf.set_font("Arial", size=12)
+    pdf.cell(0, 8, txt=f"Total Comments: {totals['total']:,}", ln=True)
+    for sentiment in logic.SENTIMENTS:
+        pdf.cell(0, 8, txt=f"{sentiment}: {totals[sentiment]:,} ({totals[sentiment] / total * 100:.1f}%)", ln=True)
+    pdf.cell(0, 8, txt=f"Trust Score: {view.trust_score()}", ln=True)
+    pdf.cell(0, 8, txt=f"Unanswered questions: {totals['unanswered_questions']:,}", ln=True)
+    pdf.set_font("Arial", "I", 9)
+    pdf.cell(0, 6, txt=f"Comment sections list up to {max_rows:,} comments each (full lists: data export).", ln=True)
+    pdf.set_font("Arial", size=12)
+    pdf.ln(6)
+
+    # 2. Charts
+    bar_chart(pdf, "Sentiment", logic.SENTIMENTS, [totals[s] for s in logic.SENTIMENTS],
+              colors=[SENTIMENT_COLORS[s] for s in logic.SENTIMENTS])
+    personas = view.counts_by(['Persona'])
+    bar_chart(pdf, "Personas", [latin1(p) for p in personas['Persona']], personas['Count'])
+    periods = view.counts_by(['Period'])
+    if not periods.empty:
+        label_format = '%Y-%m-%d %H:00' if view.freq == 'h' else '%Y-%m-%d'
+        labels, values = downsample([p.strftime(label_format) for p in periods['Period']], periods['Count'].tolist())
+        bar_chart(pdf, "Comments over time", labels, values)
+
+    # 3. Top Topics
+    heading(pdf, "Top Discussion Topics")
+    bigrams = view.bigrams()
+    for phrase, count in bigrams:
+        pdf.cell(0, 6, txt=latin1(f"- {phrase} ({count} mentions)"), ln=True)
+    if not bigrams:
+        pdf.cell(0, 6, txt="No recurring phrases.", ln=True)
+    pdf.ln(4)
+
+    # 4. Action Items / Requests (all of them, up to max_rows)
+    pdf.add_page()
+    heading(pdf, f"Action Items / Requests ({totals['requests']:,})")
+    comment_rows(pdf, df.loc[df['Is_Request'].astype(bool), cols], max_rows, "No specific requests found.")
+
+    heading(pdf, f"Unanswered Questions ({totals['unanswered_questions']:,})")
+    unanswered = df['Is_Question'].astype(bool) & logic.unanswered(df)
+    comment_rows(pdf, df.loc[unanswered, cols].sort_values('Likes', ascending=False), max_rows,
+                 "No unanswered questions.")
+
+    # 5. One section per persona: most liked comments
+    for persona in personas['Persona']:
+        rows = df.loc[df['Persona'] == persona, cols]
+        heading(pdf, f"{latin1(persona)} ({len(rows):,})")
+        comment_rows(pdf, rows.nlargest(PERSONA_ROWS, 'Likes'), PERSONA_ROWS, "None.")
+
+    heading(pdf, f"Flagged as Toxic ({totals['toxic']:,})")
+    comment_rows(pdf, df.loc[df['Is_Toxic'].astype(bool), cols], max_rows, "No toxic comments.")
+
+    # fpdf 1.x returns str (Latin-1), fpdf2 returns bytes
+    out = pdf.output(dest='S')
+    return out.encode('latin-1', 'ignore') if isinstance(out, str) else bytes(out)
+
+class ReportCache:
+    """
+    (key, max_rows) -> PDF bytes (small LRU). Building is lazy: only build() creates a report.
+    """
+    def __init__(self, max_entries=CACHE_SIZE):
+        self.max_entries = max_entries
+        self.reports = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key, max_rows=MAX_ROWS_PER_SECTION):
+        key = (key, max_rows)
+        with self.lock:
+            if key in self.reports:
+                self.reports.move_to_end(key)
+            return self.reports.get(key)
+
+    def build(self, key, df, view=None, max_rows=MAX_ROWS_PER_SECTION):
+        cached = self.get(key, max_rows)
+        if cached is not None:
+            return cached
+        pdf = build_report(df, view=view, max_rows=max_rows)
+        with self.lock:
+            self.reports[(key, max_rows)] = pdf
+            while len(self.reports) > self.max_entries:
+                self.reports.popitem(last=False)
+        return pdf
@@ -0,0 +1,178 @@
+"""
+Search indexes for "Chat with Data".
+CommentIndex: TF-IDF over one analyzed DataFrame, fitted once per dataset.
+HistoryIndex: persistent full-text index (SQLite FTS5) over every analyzed video.
+"""
+import re
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from cache import DEFAULT_DB_PATH
+
+DEFAULT_TOP_K = 3
+MIN_SCORE = 0.1 # Threshold to match
+
+class CommentIndex:
+    """
+    Fit once, then each query is vectorizer.transform + one sparse dot product.
+    TF-IDF rows are L2-normalized, so the dot product is the cosine similarity.
+    """
+    def __init__(self, df, fingerprint=None, text_column='Clean_Text'):
+        self.fingerprint = fingerprint
+        self.index = df.index
+        self.authors = df['Author'].tolist()
+        self.comments = df['Comment'].tolist()
+        # Imported on first use: sklearn is slow to import (app cold start)
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        self.vectorizer = TfidfVectorizer(stop_words='english')
+        try:
+            self.matrix = self.vectorizer.fit_transform(df[text_column].fillna("").astype(str))
+        except ValueError:
+            # Empty vocabulary (no text, or only stop words)
+            self.matrix = None
+
+    def scores(self, query):
+        """
+        Cosine similarity of the query against every indexed comment.
+        """
+        if self.matrix is None:
+            return np.zeros(len(self.comments))
+        q = self.vectorizer.transform([query])
+        return (self.matrix @ q.T).toarray().ravel()
+
+    def query(self, query, top_k=DEFAULT_TOP_K, mask=None, min_score=MIN_SCORE):
+        """
+        Top-k matches as (Author, Comment, Score).
+        `mask` (bool array over the indexed rows) restricts results, e.g. to the
+        dashboard's current filter, without refitting.
+        """
+        scores = self.scores(query)
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        top_k = min(top_k, len(scores))
+        if top_k == 0:
+            return []
+
+        # Partial sort: only the k best are ordered
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.authors[i], self.comments[i], scores[i]) for i in top if scores[i] > min_score]
+
+    def mask_for(self, subset):
+        """
+        Bool mask selecting the rows of `subset` (a filtered view of the indexed frame).
+        """
+        return self.index.isin(subset.index)
+
+class HistoryIndex:
+    """
+    Inverted index (SQLite FTS5, BM25 ranking) over all stored comments.
+    Updated incrementally: only comments not seen before are added to the index.
+    Filters by video, date range and sentiment run in the same SQL query.
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS history_comments (
+                    rowid INTEGER PRIMARY KEY,
+                    comment_id TEXT UNIQUE NOT NULL,
+                    video_id TEXT NOT NULL,
+                    author TEXT,
+                    comment TEXT,
+                    clean_text TEXT,
+                    sentiment TEXT,
+                    published TEXT
+                )
+            """)
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_video ON history_comments (video_id, published)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS history_published ON history_comments (published)")
+            # External-content FTS table: the text lives once, in history_comments
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                    clean_text, content='history_comments', content_rowid='rowid'
+                )
+            """)
+
+    def add(self, video_id, df):
+        """
+        Adds a processed DataFrame of one video. Returns: Number of new comments indexed.
+        """
+        if df.empty or 'Comment_Id' not in df.columns:
+            return 0
+        published = pd.to_datetime(df['Published_At'], utc=True).dt.strftime('%Y-%m-%dT%H:%M:%S')
+        rows = list(zip(
+            df['Comment_Id'].astype(str), [video_id] * len(df), df['Author'].astype(str),
+            df['Comment'].astype(str), df['Clean_Text'].astype(str), df['Sentiment'].astype(str), published,
+        ))
+        with self.lock, self.conn:
+            (last_rowid,) = self.conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM history_comments").fetchone()
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO history_comments "
+                "(comment_id, video_id, author, comment, clean_text, sentiment, published) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            # Scores can change (new model/backend); the indexed text does not
+            self.conn.executemany("UPDATE history_comments SET sentiment = ? WHERE comment_id = ?",
+                                  [(r[5], r[0]) for r in rows])
+            added = self.conn.execute(
+                "INSERT INTO history_fts (rowid, clean_text) "
+                "SELECT rowid, clean_text FROM history_comments WHERE rowid > ?", (last_rowid,)).rowcount
+        return added
+
+    def videos(self):
+        with self.lock:
+            return [v for (v,) in self.conn.execute(
+                "SELECT DISTINCT video_id FROM history_comments ORDER BY video_id")]
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM history_comments").fetchone()[0]
+
+    @staticmethod
+    def match_expression(query):
+        """
+        Free text -> FTS5 query: content words OR-ed together (stop words dropped).
+        """
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+        words = [w for w in re.findall(r"\w+", query.lower()) if w not in ENGLISH_STOP_WORDS]
+        return " OR ".join(f'"{w}"' for w in dict.fromkeys(words))
+
+    def search(self, query, top_k=20, video_ids=None, since=None, until=None, sentiments=None):
+        """
+        Best BM25 matches across all videos, with optional filters.
+        Returns: DataFrame (Video_Id, Author, Comment, Sentiment, Published_At, Score)
+        """
+        columns = ['Video_Id', 'Author', 'Comment', 'Sentiment', 'Published_At', 'Score']
+        expression = self.match_expression(query)
+        if not expression:
+            return pd.DataFrame(columns=columns)
+
+        sql = ["SELECT c.video_id, c.author, c.comment, c.sentiment, c.published, -bm25(history_fts)",
+               "FROM history_fts JOIN history_comments c ON c.rowid = history_fts.rowid",
+               "WHERE history_fts MATCH ?"]
+        params = [expression]
+        if video_ids:
+            sql.append(f"AND c.video_id IN ({','.join('?' * len(video_ids))})")
+            params += list(video_ids)
+        if sentiments:
+            sql.append(f"AND c.sentiment IN ({','.join('?' * len(sentiments))})")
+            params += list(sentiments)
+        if since is not None:
+            sql.append("AND c.published >= ?")
+            params.append(pd.Timestamp(since).strftime('%Y-%m-%dT%H:%M:%S'))
+        if until is not None:
+            sql.append("AND c.published < ?")
+            params.append(pd.Timestamp(until).strftime('%Y-%m-%dT%H:%M:%S'))
+        sql.append("ORDER BY bm25(history_fts) LIMIT ?")
+        params.append(int(top_k))
+
+        with self.lock:
+            rows = self.conn.execute(" ".join(sql), params).fetchall()
+        results = pd.DataFrame(rows, columns=columns)
+        results['Published_At'] = pd.to_datetime(results['Published_At'])
+        return results
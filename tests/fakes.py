@@ -0,0 +1,199 @@
+"""
+Offline stand-ins for the YouTube Data API client, shared by the tests.
+"""
+import threading
+import time
+
+import pandas as pd
+
+import logic
+from helper import PAGE_SIZE
+
+CHANNEL_ID = "UC" + "f" * 22
+
+class FakeYouTube:
+    """
+    Minimal offline stand-in for the YouTube client (commentThreads and comments).
+    Serves `n_comments` fake comments so paging can be checked without quota.
+    Thread i has `replies_per_thread` replies (default i % 3); the first
+    `reply_failures` reply requests fail with a 503 to exercise retries.
+    """
+    def __init__(self, n_comments=250, delay=0.0, replies_per_thread=None, reply_failures=0):
+        self.n_comments = n_comments
+        self.delay = delay
+        self.replies_per_thread = replies_per_thread
+        self.reply_failures = reply_failures
+        self.calls = 0
+        self.lock = threading.Lock()
+
+    def reply_count(self, i):
+        return i % 3 if self.replies_per_thread is None else self.replies_per_thread
+
+    def commentThreads(self):
+        return self
+
+    def comments(self):
+        return _FakeReplies(self)
+
+    def channels(self):
+        # Only the "@fake" handle / "fake" username exist
+        known = ({'forHandle': '@fake'}, {'forUsername': 'fake'})
+        return _FakeLookup(self, lambda kwargs: {'id': CHANNEL_ID} if kwargs in known else None)
+
+    def videos(self):
+        return _FakeLookup(self, lambda kw: {'snippet': {'channelId': CHANNEL_ID}})
+
+    def list(self, part, videoId, maxResults=PAGE_SIZE, order="relevance", pageToken=None):
+        start = int(pageToken or 0)
+        end = min(start + maxResults, self.n_comments)
+        # Comment i is published after comment i-1, so "time" serves them in reverse
+        if order == "time":
+            indices = range(self.n_comments - 1 - start, self.n_comments - 1 - end, -1)
+        else:
+            indices = range(start, end)
+        return _FakeRequest(self, videoId, indices, end)
+
+class _FakeRequest:
+    def __init__(self, client, video_id, indices, end):
+        self.client, self.video_id, self.indices, self.end = client, video_id, indices, end
+
+    def execute(self):
+        self.client.calls += 1
+        time.sleep(self.client.delay)
+        items = []
+        for i in self.indices:
+            items.append({
+                'id': f"{self.video_id}-{i}",
+                'snippet': {
+                    'totalReplyCount': self.client.reply_count(i),
+                    'topLevelComment': {
+                        'id': f"{self.video_id}-{i}",
+                        'snippet': {
+                            'authorDisplayName': f"user{i}",
+                            'textDisplay': f"Comment number {i}",
+                            'likeCount': i,
+                            'publishedAt': f"2024-01-01T{i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}Z",
+                        },
+                    },
+                },
+            })
+        response = {'items': items}
+        if self.end < self.client.n_comments:
+            response['nextPageToken'] = str(self.end)
+        return response
+
+class _FakeLookup:
+    """
+    channels()/videos().list(...).execute(): one item from `find(kwargs)`, if any.
+    """
+    def __init__(self, client, find):
+        self.client, self.find = client, find
+
+    def list(self, part, **kwargs):
+        self.kwargs = kwargs
+        return self
+
+    def execute(self):
+        self.client.calls += 1
+        item = self.find(self.kwargs)
+        return {'items': [item] if item else []}
+
+class _FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type('Response', (), {'status': status})()
+
+class _FakeReplies:
+    def __init__(self, client):
+        self.client = client
+
+    def list(self, part, parentId, maxResults=PAGE_SIZE, pageToken=None):
+        self.parent_id, self.max_results, self.start = parentId, maxResults, int(pageToken or 0)
+        return self
+
+    def execute(self):
+        client = self.client
+        with client.lock:
+            client.calls += 1
+            failing = client.reply_failures > 0
+            client.reply_failures -= failing
+        time.sleep(client.delay)
+        if failing:
+            raise _FakeHttpError(503)
+        total = client.reply_count(int(self.parent_id.rsplit('-', 1)[1]))
+        end = min(self.start + self.max_results, total)
+        items = [{
+            'id': f"{self.parent_id}.{j}",
+            'snippet': {
+                'parentId': self.parent_id,
+                'authorDisplayName': f"replier{j}",
+                'textDisplay': f"Reply {j} to {self.parent_id}",
+                'likeCount': j,
+                'publishedAt': "2024-01-02T00:00:00Z",
+            },
+        } for j in range(self.start, end)]
+        response = {'items': items}
+        if end < total:
+            response['nextPageToken'] = str(end)
+        return response
+
+class FakeModel:
+    """
+    Stand-in for the sentiment model (anything with score_batch is accepted).
+    Labels by a keyword; `delay` is seconds per call. Records every batch.
+    """
+    model_version = "fake-model"
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+
+    def score_batch(self, texts):
+        self.batches.append(list(texts))
+        time.sleep(self.delay)
+        return [('Negative' if 'bad' in t else 'Positive', 0.9) for t in texts]
+
+class FakeTokenizer:
+    """
+    Whitespace tokenizer: every word is one token.
+    """
+    def __call__(self, texts, add_special_tokens=True):
+        return {'input_ids': [t.split() for t in texts]}
+
+    def decode(self, tokens):
+        return " ".join(tokens)
+
+class FakePipeline:
+    """
+    Stand-in for the transformers pipeline: LABEL_2 (positive) scores the share
+    of 'good' words, LABEL_0 the rest. Any batch with a 'boom' word fails.
+    """
+    def __init__(self):
+        self.tokenizer = FakeTokenizer()
+        self.batches = []
+
+    def __call__(self, texts, top_k=None, **kwargs):
+        self.batches.append(list(texts))
+        if any('boom' in t.split() for t in texts):
+            raise RuntimeError("bad input")
+        outputs = []
+        for text in texts:
+            words = text.split()
+            positive = words.count('good') / len(words)
+            outputs.append([{'label': 'LABEL_2', 'score': positive}, {'label': 'LABEL_0', 'score': 1 - positive}])
+        return outputs
+
+def processed_frame(n=300, step='10min'):
+    """
+    A processed comments frame (scored by FakeModel), published every `step`.
+    """
+    raw = pd.DataFrame({
+        'Author': [f"user{i}" for i in range(n)],
+        'Comment': [f"{'bad' if i % 4 == 0 else 'nice'} camera video? {i}" if i % 5 else f"good audio {i}"
+                    for i in range(n)],
+        'Likes': [i % 7 for i in range(n)],
+        'Reply_Count': [i % 2 for i in range(n)],
+        'Published_At': pd.date_range('2024-01-01', periods=n, freq=step, tz='UTC').astype(str),
+        'Comment_Id': [str(i) for i in range(n)],
+    })
+    return logic.process_data_deep_learning(raw, FakeModel())
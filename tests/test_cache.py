@@ -0,0 +1,50 @@
+import sqlite3
+
+import pandas as pd
+
+import cache
+
+def test_scores_are_keyed_by_model_version(tmp_path):
+    scores = cache.AnalysisCache(str(tmp_path / "c.sqlite"))
+    scores.put_many([("1", "Positive", 0.9), ("2", "Negative", 0.8)], "v1")
+    assert scores.get_many(["1", "2", "3"], "v1") == {"1": ("Positive", 0.9), "2": ("Negative", 0.8)}
+    assert scores.get_many(["1"], "v2") == {}
+
+def test_expired_scores_are_ignored_and_evicted(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    scores = cache.AnalysisCache(str(tmp_path / "c.sqlite"), ttl=100)
+    scores.put_many([("old", "Positive", 0.9)], "v1")
+    now[0] += 150
+    assert scores.get_many(["old"], "v1") == {}
+    scores.put_many([("new", "Neutral", 0.5)], "v1")
+    assert len(scores) == 1
+    assert scores.get_many(["new"], "v1") == {"new": ("Neutral", 0.5)}
+
+def test_oldest_scores_are_evicted_above_max_rows(tmp_path, monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(cache.time, 'time', lambda: now[0])
+    scores = cache.AnalysisCache(str(tmp_path / "c.sqlite"), max_rows=3)
+    for i in range(5):
+        now[0] += 1
+        scores.put_many([(str(i), "Positive", 0.9)], "v1")
+    assert len(scores) == 3
+    assert set(scores.get_many([str(i) for i in range(5)], "v1")) == {"2", "3", "4"}
+
+def test_video_store_round_trip_and_old_schema(tmp_path):
+    path = str(tmp_path / "s.sqlite")
+    # A store written before gap_token existed
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE videos (video_id TEXT PRIMARY KEY, newest_published TEXT, page_token TEXT, "
+                 "frame BLOB NOT NULL, updated_at REAL NOT NULL)")
+    conn.commit()
+    conn.close()
+
+    store = cache.VideoStore(path)
+    frame = pd.DataFrame({'Comment_Id': ['a', 'b']})
+    store.save("vid", frame, "2024-01-01T00:00:00+00:00", "tok", gap_token="gap")
+    state = store.load("vid")
+    assert state['frame'].equals(frame)
+    assert (state['newest_published'], state['page_token'], state['gap_token']) == \
+        ("2024-01-01T00:00:00+00:00", "tok", "gap")
+    assert store.load("missing") is None
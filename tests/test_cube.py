@@ -0,0 +1,20 @@
+import cube
+from fakes import processed_frame
+
+def test_period_follows_the_time_span():
+    assert cube.AggregateCube(processed_frame(step='10min')).freq == 'h'
+    daily = cube.AggregateCube(processed_frame(step='6h'))
+    assert daily.freq == 'D'
+    assert len(daily.counts_by(['Period'])) == 75
+
+def test_mask_cube_matches_a_cube_of_the_subset():
+    df = processed_frame()
+    mask = df['Clean_Text'].str.contains('audio', case=False, na=False)
+    masked = cube.AggregateCube(df, mask=mask)
+    subset = cube.AggregateCube(df[mask])
+    assert masked.df is df
+    for sentiments in (None, ['Positive'], ['Negative', 'Neutral']):
+        assert masked.totals(sentiments) == subset.totals(sentiments)
+        assert masked.bigrams(sentiments) == subset.bigrams(sentiments)
+        assert masked.emoji_counts(sentiments) == subset.emoji_counts(sentiments)
+    assert masked.rows(['Positive']).equals(df[mask & (df['Sentiment'] == 'Positive')])
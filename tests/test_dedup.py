@@ -0,0 +1,29 @@
+import numpy as np
+
+from dedup import dedup_stats, duplicate_groups
+
+def test_exact_duplicates_after_normalizing():
+    texts = ["Great video!", "great   video! ", "GREAT VIDEO!", "Other comment", "Other comment"]
+    representative, unique = duplicate_groups(texts)
+    assert representative.tolist() == [0, 0, 0, 3, 3]
+    assert unique.tolist() == [0, 3]
+
+def test_near_duplicates_only_when_asked():
+    base = "This is the best explanation of camera sensors I have seen on YouTube, thank you so much"
+    texts = [base, base + "!!", "Completely unrelated comment about audio levels and microphones here"]
+    representative, _ = duplicate_groups(texts)
+    assert len(set(representative.tolist())) == 3
+    representative, unique = duplicate_groups(texts, near=True)
+    assert representative[0] == representative[1] != representative[2]
+    assert len(unique) == 2
+
+def test_every_text_points_to_a_representative_of_the_same_text():
+    rng = np.random.default_rng(0)
+    texts = [f"comment {i}" for i in rng.integers(0, 50, 500)]
+    representative, unique = duplicate_groups(texts)
+    assert set(representative.tolist()) == set(unique.tolist())
+    assert all(texts[r] == t for r, t in zip(representative, texts))
+
+def test_dedup_stats():
+    assert dedup_stats(10, 4) == {'rows': 10, 'unique': 4, 'dedup_ratio': 0.6}
+    assert dedup_stats(0, 0)['dedup_ratio'] == 0.0
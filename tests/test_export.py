@@ -0,0 +1,48 @@
+import io
+
+import pandas as pd
+import pytest
+
+import export
+import logic
+
+def frame(n=23):
+    return pd.DataFrame({
+        'Comment_Id': [f"c{i}" for i in range(n)],
+        'Clean_Text': pd.array([f"comment {i}, with \"quotes\"" for i in range(n)], dtype='string[pyarrow]'),
+        'Likes': list(range(n)),
+        'Confidence': [i / n for i in range(n)],
+        'Is_Toxic': [i % 3 == 0 for i in range(n)],
+        # Later chunks only use some of the categories
+        'Persona': pd.Categorical([logic.PERSONAS[0] if i < 10 else logic.PERSONAS[1] for i in range(n)],
+                                  categories=logic.PERSONAS),
+    })
+
+def read_back(data, fmt):
+    if fmt == 'parquet':
+        return pd.read_parquet(io.BytesIO(data))
+    if fmt == 'jsonl':
+        return pd.read_json(io.BytesIO(data), lines=True, dtype={'Comment_Id': str})
+    return pd.read_csv(io.BytesIO(data), compression='gzip' if fmt == 'csv.gz' else None)
+
+@pytest.mark.parametrize('fmt', list(export.FORMATS))
+def test_chunked_round_trip(fmt):
+    df = frame()
+    data = export.export_bytes(df, fmt, chunk_rows=5)
+    back = read_back(data, fmt)
+    assert len(back) == len(df)
+    if fmt == 'parquet':
+        # Schema (categorical, Arrow strings) is kept across chunks
+        assert isinstance(back['Persona'].dtype, pd.CategoricalDtype)
+        assert list(back['Persona'].cat.categories) == logic.PERSONAS
+        pd.testing.assert_frame_equal(back, df, check_dtype=False)
+    else:
+        expected = df.astype({'Clean_Text': object, 'Persona': object})
+        pd.testing.assert_frame_equal(back, expected, check_dtype=False)
+
+def test_writer_to_path_counts_rows(tmp_path):
+    path = tmp_path / "out.csv.gz"
+    with export.ExportWriter(path) as writer:
+        writer.write(frame(12), chunk_rows=5).write(frame(3), chunk_rows=5)
+    assert writer.fmt == 'csv.gz' and writer.rows == 15
+    assert len(pd.read_csv(path)) == 15
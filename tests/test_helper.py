@@ -0,0 +1,94 @@
+import time
+
+import pandas as pd
+
+import helper
+from fakes import CHANNEL_ID, FakeYouTube
+
+URL = "https://www.youtube.com/watch?v=vid"
+
+def test_pages_follow_next_page_token():
+    fake = FakeYouTube(n_comments=250)
+    pages = list(helper.iter_comment_pages("vid", youtube=fake, max_comments=1000))
+    assert [len(p) for p in pages] == [100, 100, 50]
+    assert fake.calls == 3
+    assert pages[-1].attrs['next_page_token'] is None
+
+def test_max_comments_caps_rows_and_requests():
+    fake = FakeYouTube(n_comments=1000)
+    comments = helper.fetch_comments(URL, max_comments=230, youtube=fake)
+    assert len(comments) == 230
+    assert comments['Comment_Id'].is_unique
+    # The last page only asks for what is left
+    assert fake.calls == 3
+
+def test_time_budget_stops_paging():
+    fake = FakeYouTube(n_comments=10_000, delay=0.05)
+    started = time.monotonic()
+    pages = list(helper.iter_comment_pages("vid", youtube=fake, max_comments=10_000, time_budget=0.12))
+    assert 1 <= len(pages) < 10
+    assert time.monotonic() - started < 1.0
+
+def test_cursor_resumes_where_the_last_page_stopped():
+    fake = FakeYouTube(n_comments=250)
+    first = list(helper.iter_comment_pages("vid", youtube=fake, max_comments=100))
+    token = first[-1].attrs['next_page_token']
+    assert token
+    rest = list(helper.iter_comment_pages("vid", youtube=fake, max_comments=1000, page_token=token))
+    ids = pd.concat(first + rest)['Comment_Id']
+    assert ids.is_unique and len(ids) == 250
+
+def test_no_prefetch_when_disabled():
+    fake = FakeYouTube(n_comments=250)
+    pages = helper.iter_comment_pages("vid", youtube=fake, prefetch=False)
+    next(pages)
+    assert fake.calls == 1
+    pages.close()
+
+def test_fetch_new_comments_stops_at_known_comment():
+    fake = FakeYouTube(n_comments=100)
+    known = helper.fetch_comments(URL, youtube=fake, order="time")['Comment_Id']
+    fake.n_comments = 130
+    new = helper.fetch_new_comments("vid", known, youtube=fake)
+    assert sorted(new['Comment_Id']) == sorted(f"vid-{i}" for i in range(100, 130))
+    assert new.attrs['next_page_token'] is None
+
+def test_fetch_new_comments_reports_cursor_when_capped():
+    fake = FakeYouTube(n_comments=100)
+    known = helper.fetch_comments(URL, youtube=fake, order="time")['Comment_Id']
+    fake.n_comments = 350
+    new = helper.fetch_new_comments("vid", known, youtube=fake, max_comments=100)
+    assert len(new) == 100
+    token = new.attrs['next_page_token']
+    assert token
+    rest = helper.fetch_new_comments("vid", set(known) | set(new['Comment_Id']), youtube=fake,
+                                     page_token=token, stop_at_seen=False)
+    assert len(rest) == 150
+
+def test_replies_respect_caps_and_retry(monkeypatch):
+    monkeypatch.setattr(helper, 'RETRY_BACKOFF', 0.001)
+    fake = FakeYouTube(n_comments=100, replies_per_thread=150, reply_failures=2)
+    threads = helper.fetch_comments(URL, max_comments=100, youtube=fake)
+    replies = helper.fetch_replies(threads, youtube=fake, max_replies=450, retries=3)
+    assert len(replies) == 450
+    assert replies.attrs['reply_stats'] == {'threads': 5, 'failed': 0, 'replies': 450}
+    assert set(replies['Parent_Id']) <= set(threads['Comment_Id'])
+    assert (replies.groupby('Parent_Id').size() <= helper.MAX_REPLIES_PER_THREAD).all()
+
+def test_replies_failing_threads_are_skipped():
+    fake = FakeYouTube(n_comments=10, replies_per_thread=5, reply_failures=1000)
+    threads = helper.fetch_comments(URL, youtube=fake)
+    replies = helper.fetch_replies(threads, youtube=fake, retries=0)
+    assert replies.empty
+    assert replies.attrs['reply_stats']['failed'] == 10
+
+def test_channel_id_from_urls_ids_and_handles():
+    fake = FakeYouTube()
+    assert helper.get_channel_id(CHANNEL_ID) == CHANNEL_ID
+    assert helper.get_channel_id(f"https://www.youtube.com/channel/{CHANNEL_ID}/videos") == CHANNEL_ID
+    assert fake.calls == 0
+    assert helper.get_channel_id("https://www.youtube.com/@fake", youtube=fake) == CHANNEL_ID
+    assert helper.get_channel_id("@fake", youtube=fake) == CHANNEL_ID
+    assert helper.get_channel_id("https://www.youtube.com/user/fake", youtube=fake) == CHANNEL_ID
+    assert helper.get_channel_id(URL, youtube=fake) == CHANNEL_ID
+    assert helper.get_channel_id("https://www.youtube.com/@missing", youtube=fake) is None
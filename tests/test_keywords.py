@@ -0,0 +1,37 @@
+import random
+
+import pandas as pd
+
+import logic
+from keywords import KeywordMatcher
+
+CATEGORIES = {
+    'a': ['how', 'help', 'he', 'hate'],
+    'b': ['hat', 'at', 'hello', 'lo'],
+    'c': ['make a video', 'make', 'a v', 'tutorial on'],
+}
+
+def expected(text):
+    return {name for name, keywords in CATEGORIES.items() if any(k in text.lower() for k in keywords)}
+
+def random_texts(n, seed=0):
+    rng = random.Random(seed)
+    words = ['how', 'hello', 'hat', 'he', 'make', 'a', 'video', 'tutorial', 'on', 'x', 'Hate', 'lo']
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(0, 6))) for _ in range(n)]
+
+def test_match_agrees_with_substring_check():
+    matcher = KeywordMatcher(CATEGORIES)
+    for text in random_texts(2000):
+        assert matcher.match(text) == expected(text), text
+
+def test_match_frame_agrees_with_substring_check():
+    matcher = KeywordMatcher(CATEGORIES)
+    texts = pd.Series(random_texts(2000, seed=1)).str.lower()
+    frame = matcher.match_frame(texts)
+    for text, (_, row) in zip(texts, frame.iterrows()):
+        assert {name for name in CATEGORIES if row[name]} == expected(text), text
+
+def test_builtin_and_custom_sets():
+    matcher = logic.build_keyword_matcher({'audio': ['mic', 'sound']})
+    assert matcher.match("Please make a tutorial on the MIC setup") >= {'request', 'audio'}
+    assert 'audio' not in logic.KEYWORD_MATCHER.match("the sound is bad")
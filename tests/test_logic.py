@@ -0,0 +1,66 @@
+import pytest
+
+import logic
+from fakes import FakePipeline, processed_frame
+
+def covered(starts, n_tokens, window=logic.WINDOW_TOKENS):
+    return all(any(s <= t < s + window for s in starts) for t in range(n_tokens))
+
+def test_window_starts():
+    assert logic.window_starts(100) == [0]
+    assert logic.window_starts(510) == [0]
+    assert logic.window_starts(900) == [0, 390]
+    assert logic.window_starts(1000) == [0, 384, 490]
+    for n_tokens in (511, 600, 894, 895, 900, 1200, 1500):
+        starts = logic.window_starts(n_tokens)
+        assert covered(starts, n_tokens)
+        # Only a text just over one window gets two heavily overlapping windows
+        assert all(b - a >= logic.WINDOW_MIN_STEP for a, b in zip(starts[1:], starts[2:]))
+
+def test_window_starts_caps_long_texts():
+    starts = logic.window_starts(10_000)
+    assert len(starts) == logic.MAX_WINDOWS
+    assert starts[0] == 0 and starts[-1] == 10_000 - logic.WINDOW_TOKENS
+
+def test_fingerprint_covers_every_column():
+    df = processed_frame(20).assign(Custom_Tags='')
+    fingerprint = logic.dataset_fingerprint(df)
+    assert logic.dataset_fingerprint(df.copy()) == fingerprint
+    for column, value in [('Custom_Tags', 'audio'), ('Confidence', 0.5), ('Is_Toxic', True),
+                          ('Persona', logic.PERSONAS[0])]:
+        changed = df.copy()
+        changed.loc[1, column] = value
+        assert changed.loc[1, column] != df.loc[1, column]
+        assert logic.dataset_fingerprint(changed) != fingerprint, column
+
+def test_split_windows_keeps_short_texts_whole():
+    model = FakePipeline()
+    long_text = " ".join(["good"] * 600 + ["bad"] * 400)
+    windows, owners, lengths = logic.split_windows(["good bad", long_text], model)
+    assert windows[0] == "good bad"
+    assert owners == [0, 1, 1, 1]
+    assert lengths == [2] + [logic.WINDOW_TOKENS] * 3
+    assert all(len(w.split()) == logic.WINDOW_TOKENS for w in windows[1:])
+
+def test_analyze_roberta_batch_windows_order_and_fallback():
+    model = FakePipeline()
+    words = ["good"] * 600 + ["bad"] * 400
+    texts = ["good good good bad", " ".join(words), "bad", "good boom", "bad bad good good good good"]
+    results = logic.analyze_roberta_batch(texts, model, batch_size=2)
+
+    # Windows share the length-sorted batches with the short texts;
+    # the failed first batch is retried one text at a time
+    sizes = [[len(t.split()) for t in batch] for batch in model.batches]
+    window = logic.WINDOW_TOKENS
+    assert sizes == [[1, 2], [1], [2], [4, 6], [window, window], [window]]
+
+    # Long text: token-weighted mean over its windows
+    starts = logic.window_starts(len(words))
+    shares = [words[s:s + logic.WINDOW_TOKENS].count("good") / logic.WINDOW_TOKENS for s in starts]
+    assert results[1] == ('Positive', pytest.approx(sum(shares) / len(shares)))
+
+    # Short texts come back in input order; the failing one alone falls back to Neutral
+    assert results[0] == ('Positive', 0.75)
+    assert results[2] == ('Negative', 1.0)
+    assert results[3] == ('Neutral', 0.0)
+    assert results[4] == ('Positive', pytest.approx(4 / 6))
@@ -0,0 +1,102 @@
+import time
+
+import cache
+import pipeline
+from fakes import FakeModel, FakeYouTube
+
+URL = "https://www.youtube.com/watch?v=vid"
+
+def comment_numbers(df):
+    return sorted(int(cid.split('-')[1]) for cid in df['Comment_Id'])
+
+def test_analyze_video_scores_pages_while_fetching():
+    fake = FakeYouTube(n_comments=1000, delay=0.1)
+    model = FakeModel(delay=0.1)
+    started = time.monotonic()
+    processed = pipeline.analyze_video(URL, model, youtube=fake, max_comments=1000)
+    elapsed = time.monotonic() - started
+    assert len(processed) == 1000
+    # One model call per page, overlapped with the next page's fetch (sequential: 2s)
+    assert len(model.batches) == 10
+    assert elapsed < 1.6
+    assert processed.attrs['pipeline_stats']['rows'] == 1000
+
+def test_analyze_video_with_replies():
+    fake = FakeYouTube(n_comments=50, replies_per_thread=20)
+    processed = pipeline.analyze_video(URL, FakeModel(), youtube=fake, max_comments=50, max_replies=100)
+    assert len(processed) == 150
+    assert processed['Parent_Id'].notna().sum() == 100
+    assert processed.attrs['reply_stats']['replies'] == 100
+
+def test_analyze_video_invalid_url():
+    assert "error" in pipeline.analyze_video("not a url", FakeModel(), youtube=FakeYouTube())
+
+def test_refresh_video_fetches_only_new_comments(tmp_path):
+    store = cache.VideoStore(str(tmp_path / "store.sqlite"))
+    fake = FakeYouTube(n_comments=100)
+    model = FakeModel()
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake)
+    assert new == 100 and len(merged) == 100
+
+    fake.n_comments = 130
+    calls = fake.calls
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake)
+    assert new == 30
+    assert comment_numbers(merged) == list(range(130))
+    assert fake.calls - calls == 1
+
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake)
+    assert new == 0 and len(merged) == 130
+
+def test_refresh_video_resumes_after_hitting_the_limit(tmp_path):
+    store = cache.VideoStore(str(tmp_path / "store.sqlite"))
+    fake = FakeYouTube(n_comments=100)
+    model = FakeModel()
+    pipeline.refresh_video(URL, model, store, youtube=fake, max_comments=100)
+
+    fake.n_comments = 350
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake, max_comments=100)
+    assert new == 100 and merged.attrs['refresh_truncated']
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake, max_comments=100)
+    assert new == 100 and merged.attrs['refresh_truncated']
+    # New comments arriving meanwhile are picked up once the gap is closed
+    fake.n_comments = 370
+    merged, new = pipeline.refresh_video(URL, model, store, youtube=fake, max_comments=100)
+    assert new == 70 and not merged.attrs['refresh_truncated']
+    assert comment_numbers(merged) == list(range(370))
+    assert store.load('vid')['gap_token'] is None
+
+def test_refresh_video_backfills_older_comments(tmp_path):
+    store = cache.VideoStore(str(tmp_path / "store.sqlite"))
+    fake = FakeYouTube(n_comments=300)
+    merged, _ = pipeline.refresh_video(URL, FakeModel(), store, youtube=fake, max_comments=100)
+    assert comment_numbers(merged) == list(range(200, 300))
+    merged, new = pipeline.refresh_video(URL, FakeModel(), store, youtube=fake, max_comments=100, backfill=150)
+    assert new == 150
+    assert comment_numbers(merged) == list(range(50, 300))
+
+def test_model_worker_returns_results_in_order():
+    model = FakeModel()
+    worker = pipeline.ModelWorker(model, max_batch=64, max_wait=0.01)
+    try:
+        jobs = [[f"{'bad' if j % 3 else 'good'} {i}-{j}" for j in range(i * 13 % 150)] for i in range(20)]
+        futures = [worker.submit(texts) for texts in jobs]
+        for texts, future in zip(jobs, futures):
+            labels = [label for label, _ in future.result(timeout=10)]
+            assert labels == ['Negative' if 'bad' in t else 'Positive' for t in texts]
+    finally:
+        worker.close()
+    assert max(len(batch) for batch in model.batches) <= 64
+
+def test_model_worker_small_request_is_not_stuck_behind_a_large_one():
+    model = FakeModel(delay=0.05)
+    worker = pipeline.ModelWorker(model, max_batch=100, max_wait=0.0)
+    try:
+        large = worker.submit([f"good {i}" for i in range(2000)])
+        time.sleep(0.02)
+        small = worker.submit(["bad one", "good two"])
+        assert small.result(timeout=5) == [('Negative', 0.9), ('Positive', 0.9)]
+        assert not large.done()
+        assert len(large.result(timeout=10)) == 2000
+    finally:
+        worker.close()
@@ -0,0 +1,16 @@
+import pytest
+
+pytest.importorskip("fpdf")
+
+import report
+from fakes import processed_frame
+
+def test_report_cache_is_keyed_by_row_limit():
+    df = processed_frame(n=400)
+    reports = report.ReportCache()
+    short = reports.build("video", df, max_rows=10)
+    assert short.startswith(b"%PDF")
+    assert reports.get("video", 10) is short
+    assert reports.get("video", 500) is None
+    longer = reports.build("video", df, max_rows=500)
+    assert len(longer) > len(short)
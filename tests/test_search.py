@@ -0,0 +1,40 @@
+import pandas as pd
+
+import search
+from fakes import processed_frame
+
+def fts_in_sync(index):
+    # Raises if the FTS index and history_comments disagree
+    with index.conn:
+        index.conn.execute("INSERT INTO history_fts (history_fts) VALUES ('integrity-check')")
+    return True
+
+def test_re_adding_a_video_indexes_nothing_new(tmp_path):
+    index = search.HistoryIndex(str(tmp_path / "h.sqlite"))
+    df = processed_frame(20)
+    assert index.add("vidA", df) == 20
+    rescored = df.assign(Sentiment='Neutral')
+    assert index.add("vidA", rescored) == 0
+    assert len(index) == 20 and fts_in_sync(index)
+
+    results = index.search("camera", top_k=100)
+    assert len(results) == 16 # Each comment once, not once per add()
+    assert set(results['Sentiment']) == {'Neutral'}
+
+def test_search_filters(tmp_path):
+    index = search.HistoryIndex(str(tmp_path / "h.sqlite"))
+    index.add("vidA", processed_frame(20))
+    index.add("vidB", processed_frame(20).assign(Comment_Id=lambda d: "b" + d['Comment_Id']))
+    assert index.videos() == ["vidA", "vidB"] and fts_in_sync(index)
+
+    assert len(index.search("camera", top_k=100)) == 32
+    only_b = index.search("camera", top_k=100, video_ids=["vidB"])
+    assert len(only_b) == 16 and set(only_b['Video_Id']) == {"vidB"}
+    negative = index.search("camera", top_k=100, sentiments=["Negative"])
+    assert len(negative) == 8 and set(negative['Sentiment']) == {"Negative"}
+
+    # Comments are 10 minutes apart from midnight: [01:00, 02:00) holds rows 6..11
+    window = index.search("camera", top_k=100, video_ids=["vidA"], since="2024-01-01 01:00", until="2024-01-01 02:00")
+    assert len(window) == 5
+    assert window['Published_At'].between(pd.Timestamp("2024-01-01 01:00"), pd.Timestamp("2024-01-01 01:50")).all()
+    assert index.search("the", top_k=100).empty
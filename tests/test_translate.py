@@ -0,0 +1,70 @@
+import threading
+
+import pandas as pd
+import pytest
+
+import logic
+import translate
+from fakes import FakeModel
+
+SPANISH = "Muy bueno el video, gracias por la explicación"
+PORTUGUESE = "Muito obrigado, você é o melhor"
+
+def test_language_gate():
+    assert translate.looks_english("This is the best video about cameras")
+    assert translate.looks_english("🔥🔥🔥")
+    assert translate.looks_english("first comment here")
+    assert not translate.looks_english(SPANISH)
+    assert not translate.looks_english("これはすごい動画です")
+
+def test_only_unique_non_english_texts_are_translated(tmp_path):
+    stub = translate.StubTranslator({SPANISH: "Very good video, thanks for the explanation"})
+    service = translate.TranslationService(stub, cache_path=str(tmp_path / "t.sqlite"), batch_size=2)
+    texts = ["great video", SPANISH, PORTUGUESE, SPANISH, "great video"]
+    out, stats = service.translate_many(texts)
+    assert out == ["great video", "Very good video, thanks for the explanation", f"[en] {PORTUGUESE}",
+                   "Very good video, thanks for the explanation", "great video"]
+    assert stub.texts == 2
+    assert stats == {'texts': 5, 'non_english': 2, 'translated': 2, 'failed': 0}
+
+def test_cache_is_shared_across_services(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    translate.TranslationService(translate.StubTranslator(), cache_path=path).translate_many([SPANISH])
+    stub = translate.StubTranslator()
+    out, stats = translate.TranslationService(stub, cache_path=path).translate_many([SPANISH])
+    assert out == [f"[en] {SPANISH}"]
+    assert stub.calls == 0 and stats['translated'] == 0
+
+def test_failed_translations_are_not_cached(tmp_path):
+    path = str(tmp_path / "t.sqlite")
+    failing = translate.TranslationService(translate.StubTranslator({SPANISH: None}), cache_path=path)
+    out, stats = failing.translate_many([SPANISH, PORTUGUESE])
+    assert out == [SPANISH, f"[en] {PORTUGUESE}"]
+    assert stats['failed'] == 1 and stats['translated'] == 1
+
+    # Once the backend recovers, the failed text is translated
+    stub = translate.StubTranslator()
+    out, _ = translate.TranslationService(stub, cache_path=path).translate_many([SPANISH, PORTUGUESE])
+    assert out == [f"[en] {SPANISH}", f"[en] {PORTUGUESE}"]
+    assert stub.texts == 1
+
+def test_pipeline_counts_translations_of_its_own_call():
+    service = translate.TranslationService(translate.StubTranslator(), cache_path=None)
+    df = pd.DataFrame({'Author': 'a', 'Comment': [SPANISH, "good video", PORTUGUESE], 'Likes': 0,
+                       'Comment_Id': ['1', '2', '3'], 'Published_At': '2024-01-01'})
+    out = logic.process_data_deep_learning(df, FakeModel(), translator=service)
+    assert out.attrs['pipeline_stats']['translated'] == 2
+    assert out['Clean_Text'].tolist()[0] == f"[en] {SPANISH}"
+
+class FailingModel(FakeModel):
+    def score_batch(self, texts):
+        raise RuntimeError("model server is down")
+
+def test_failed_scoring_leaves_no_translation_thread():
+    service = translate.TranslationService(translate.StubTranslator(), cache_path=None)
+    texts = [f"{SPANISH} {i}" for i in range(50)]
+    df = pd.DataFrame({'Comment_Id': [str(i) for i in range(50)]})
+    before = set(threading.enumerate())
+    with pytest.raises(RuntimeError):
+        logic.translate_and_score(df, texts, FailingModel(), service, chunk_size=5)
+    assert set(threading.enumerate()) == before
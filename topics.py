@@ -0,0 +1,114 @@
+"""
+Top themes (n-gram counts) shared by every view that shows them.
+1. Counts are column sums of the sparse document-term matrix (never densified).
+2. Results are memoized by a content key of the texts, so the summary,
+   Deep Insights, the PDF report and Battle Mode reuse one computation.
+3. Counts are mergeable: counts(old + new) == counts(old) + counts(new),
+   so a refresh only vectorizes the new comments.
+"""
+import heapq
+import threading
+from collections import Counter, OrderedDict
+
+import numpy as np
+import pandas as pd
+
+NGRAM_RANGE = (2, 2)
+TOP_N = 10
+MEMO_SIZE = 32
+_MASK = 0xFFFFFFFFFFFFFFFF
+
+def clean_texts(texts):
+    """
+    Non-missing texts as a string Series (Series input is not copied if already strings).
+    """
+    if not isinstance(texts, pd.Series):
+        texts = pd.Series(list(texts), dtype=object)
+    texts = texts.dropna()
+    return texts if pd.api.types.is_string_dtype(texts) else texts.astype(str)
+
+def text_key(texts):
+    """
+    Order-independent content key: (count, sum of text hashes).
+    Keys of two text sets add up to the key of their union.
+    """
+    hashes = pd.util.hash_pandas_object(clean_texts(texts), index=False).to_numpy()
+    return len(hashes), int(hashes.sum(dtype=np.uint64))
+
+def combine_keys(a, b):
+    return a[0] + b[0], (a[1] + b[1]) & _MASK
+
+def ngram_counts(texts, ngram_range=NGRAM_RANGE):
+    """
+    N-gram counts over all texts (English stop words removed).
+    Returns: Counter phrase -> count
+    """
+    from sklearn.feature_extraction.text import CountVectorizer
+    vectorizer = CountVectorizer(ngram_range=ngram_range, stop_words='english')
+    try:
+        X = vectorizer.fit_transform(clean_texts(texts))
+    except ValueError:
+        # Empty vocabulary (no text, or only stop words)
+        return Counter()
+    sums = np.asarray(X.sum(axis=0)).ravel()
+    return Counter(dict(zip(vectorizer.get_feature_names_out(), sums.tolist())))
+
+def top_ngrams(counts, n=TOP_N):
+    """
+    Returns: List of (phrase, count), most frequent first (ties alphabetical).
+    """
+    return heapq.nsmallest(n, counts.items(), key=lambda kv: (-kv[1], kv[0]))
+
+class TopicService:
+    """
+    Memoized n-gram counts, keyed by text content (LRU of `memo_size` text sets).
+    """
+    def __init__(self, ngram_range=NGRAM_RANGE, memo_size=MEMO_SIZE):
+        self.ngram_range = ngram_range
+        self.memo_size = memo_size
+        self.memo = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _get(self, key):
+        with self.lock:
+            if key in self.memo:
+                self.memo.move_to_end(key)
+                return self.memo[key]
+        return None
+
+    def _put(self, key, counts):
+        with self.lock:
+            self.memo[key] = counts
+            self.memo.move_to_end(key)
+            while len(self.memo) > self.memo_size:
+                self.memo.popitem(last=False)
+        return counts
+
+    def counts(self, texts, key=None):
+        key = key or text_key(texts)
+        cached = self._get(key)
+        if cached is not None:
+            return cached
+        return self._put(key, ngram_counts(texts, self.ngram_range))
+
+    def top(self, texts, n=TOP_N):
+        return top_ngrams(self.counts(texts), n)
+
+    def merge(self, old_texts, new_texts):
+        """
+        Counts for old + new texts. Only the new texts are vectorized when the
+        old counts are memoized. The result is memoized under the combined key.
+        """
+        old_key, new_key = text_key(old_texts), text_key(new_texts)
+        merged_key = combine_keys(old_key, new_key)
+        cached = self._get(merged_key)
+        if cached is not None:
+            return cached
+        merged = self.counts(old_texts, old_key) + self.counts(new_texts, new_key)
+        return self._put(merged_key, merged)
+
+# Shared by the app and the headless jobs in this process
+TOPICS = TopicService()
+
+# Single-word frequencies (word clouds)
+WORDS = TopicService(ngram_range=(1, 1))
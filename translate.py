@@ -0,0 +1,190 @@
+"""
+Language-gated, batched translation with a persistent cache.
+1. A local language check skips comments that are already English.
+2. Repeated texts are translated once (keyed by text hash, cached in SQLite).
+3. The rest goes out in batches, several at a time, under a rate limit.
+"""
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from cache import DEFAULT_DB_PATH
+
+# Frequent English words
+ENGLISH_HINTS = {
+    "the", "a", "an", "and", "or", "but", "is", "are", "was", "were", "be", "been", "i", "you", "he",
+    "she", "it", "we", "they", "me", "my", "your", "this", "that", "these", "those", "of", "to", "in",
+    "on", "for", "with", "at", "from", "by", "about", "as", "so", "not", "no", "do", "does", "did",
+    "have", "has", "had", "can", "will", "would", "should", "could", "just", "like", "what", "how",
+    "why", "when", "who", "which", "if", "all", "more", "very", "really", "great", "good", "love",
+    "video", "thanks", "thank", "please", "lol", "its", "it's", "i'm", "don't", "much", "best",
+}
+# Frequent function words of other Latin-script languages seen in comments (es/pt/fr/de/it/id)
+FOREIGN_HINTS = {
+    "el", "la", "los", "las", "es", "este", "esta", "muy", "que", "por", "para", "con", "pero", "como",
+    "una", "del", "mas", "más", "gracias", "não", "nao", "você", "voce", "muito", "obrigado", "le",
+    "les", "est", "très", "tres", "merci", "pour", "avec", "c'est", "der", "die", "das", "und", "ist",
+    "nicht", "sehr", "ich", "danke", "mit", "il", "di", "che", "è", "molto", "grazie", "yang", "dan",
+    "ini", "itu", "tidak", "sangat", "bagus", "aku", "saya",
+}
+WORD_RE = re.compile(r"[^\W\d_]+(?:'[^\W\d_]+)?")
+
+def looks_english(text):
+    """
+    Cheap local language check (no network).
+    Mostly non-Latin letters -> not English. Otherwise compare hits on common
+    English vs. other-language function words; with no foreign hits it's English.
+    Letter-free comments ("🔥🔥") count as English: nothing to translate.
+    """
+    letters = [c for c in str(text) if c.isalpha()]
+    if not letters:
+        return True
+    if sum(c.isascii() for c in letters) / len(letters) < 0.8:
+        return False
+    words = WORD_RE.findall(str(text).lower())
+    foreign = sum(w in FOREIGN_HINTS for w in words)
+    english = sum(w in ENGLISH_HINTS for w in words)
+    return foreign == 0 or english > foreign
+
+def text_key(text):
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+class RateLimiter:
+    """
+    Token bucket shared by all worker threads: at most `rate` calls per second.
+    """
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self.lock = threading.Lock()
+        self.next_slot = time.monotonic()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            wait = self.next_slot - now
+            self.next_slot = max(now, self.next_slot) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+class GoogleBackend:
+    """
+    deep_translator's GoogleTranslator (one HTTP call per text, rate limited).
+    A failed text comes back as None, so it is retried next time instead of cached.
+    """
+    def __init__(self, rate=5.0, target='en'):
+        self.limiter = RateLimiter(rate)
+        self.target = target
+
+    def translate_batch(self, texts):
+        from deep_translator import GoogleTranslator
+        translator = GoogleTranslator(source='auto', target=self.target)
+        out = []
+        for text in texts:
+            self.limiter.acquire()
+            try:
+                out.append(translator.translate(text) or None)
+            except:
+                out.append(None)
+        return out
+
+class StubTranslator:
+    """
+    Offline translator for tests/demos: looks texts up in `mapping`,
+    otherwise tags them. A text mapped to None fails (like a network error).
+    Counts the texts it was asked to translate.
+    """
+    def __init__(self, mapping=None):
+        self.mapping = mapping or {}
+        self.calls = 0
+        self.texts = 0
+
+    def translate_batch(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        return [self.mapping.get(t, f"[en] {t}") for t in texts]
+
+class TranslationCache:
+    """
+    SQLite table text hash -> translation (persistent across runs).
+    """
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.lock, self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS translations (
+                    text_hash TEXT PRIMARY KEY,
+                    translated TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    def get_many(self, keys):
+        hits = {}
+        keys = list(keys)
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows = self.conn.execute(
+                    f"SELECT text_hash, translated FROM translations WHERE text_hash IN ({','.join('?' * len(chunk))})",
+                    chunk)
+                hits.update(rows)
+        return hits
+
+    def put_many(self, pairs):
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO translations VALUES (?, ?, ?)",
+                                  [(k, v, now) for k, v in pairs])
+
+class TranslationService:
+    """
+    translate_many(texts) -> (English texts in the same order, stats).
+    Only non-English, not-yet-cached, unique texts reach the translator.
+    Only successful translations are cached; failed texts stay as they are.
+    Keeps no per-call state, so one service can be shared by all sessions.
+    """
+    def __init__(self, translator=None, cache_path=DEFAULT_DB_PATH, batch_size=25, max_workers=4):
+        self.translator = translator or GoogleBackend()
+        self.cache = TranslationCache(cache_path) if cache_path else None
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+
+    def translate_many(self, texts):
+        """
+        Returns: (List of texts, dict with 'texts', 'non_english', 'translated', 'failed')
+        """
+        texts = [str(t) for t in texts]
+
+        # 1. Language gate + dedup by hash (None = already English)
+        keys = [None if looks_english(t) else text_key(t) for t in texts]
+        todo = {}
+        for k, t in zip(keys, texts):
+            if k:
+                todo.setdefault(k, t)
+
+        # 2. Persistent cache
+        done = self.cache.get_many(todo) if self.cache else {}
+        missing = [(k, t) for k, t in todo.items() if k not in done]
+
+        # 3. Batched, concurrent translation of what's left
+        batches = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+        failed = 0
+        if batches:
+            def run(batch):
+                return self.translator.translate_batch([t for _, t in batch])
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                for batch, out in zip(batches, pool.map(run, batches)):
+                    fresh = [(k, translated) for (k, _), translated in zip(batch, out) if translated is not None]
+                    failed += len(batch) - len(fresh)
+                    done.update(fresh)
+                    if self.cache and fresh:
+                        self.cache.put_many(fresh)
+
+        stats = {'texts': len(texts), 'non_english': len(todo), 'translated': len(missing) - failed,
+                 'failed': failed}
+        return [done.get(k, t) if k else t for k, t in zip(keys, texts)], stats
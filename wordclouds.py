@@ -0,0 +1,71 @@
+"""
+Word cloud images, cached as PNG bytes and rendered off the script thread.
+1. Frequencies come from topics.WORDS (sparse counts, memoized per text set),
+   downsampled to the MAX_WORDS most frequent words.
+2. WordCloud.generate_from_frequencies draws them; no matplotlib figure.
+3. A background worker renders; callers get a Future, so the page keeps
+   drawing other tabs while the image is made.
+"""
+import io
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import topics
+
+WIDTH = 800
+HEIGHT = 400
+MAX_WORDS = 200
+CACHE_SIZE = 32
+
+def top_frequencies(texts, max_words=MAX_WORDS):
+    """
+    Returns: Dict word -> count of the max_words most frequent words.
+    """
+    return dict(topics.top_ngrams(topics.WORDS.counts(texts), max_words))
+
+def render_png(frequencies, width=WIDTH, height=HEIGHT):
+    """
+    Returns: PNG bytes, or None if there are no words.
+    """
+    if not frequencies:
+        return None
+    from wordcloud import WordCloud
+    cloud = WordCloud(width=width, height=height, background_color='white',
+                      max_words=len(frequencies)).generate_from_frequencies(frequencies)
+    buffer = io.BytesIO()
+    cloud.to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+class WordCloudCache:
+    """
+    key -> Future of PNG bytes (LRU). The key names the data, e.g.
+    (dataset fingerprint, keyword filter, sentiment filter).
+    """
+    def __init__(self, max_entries=CACHE_SIZE, workers=1):
+        self.max_entries = max_entries
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="wordcloud")
+        self.futures = OrderedDict()
+        self.lock = threading.Lock()
+
+    def submit(self, key, texts):
+        """
+        Starts rendering unless `key` is cached or in progress. Returns: Future.
+        """
+        with self.lock:
+            future = self.futures.get(key)
+            if future is not None:
+                self.futures.move_to_end(key)
+                return future
+            future = self.pool.submit(lambda: render_png(top_frequencies(texts)))
+            self.futures[key] = future
+            while len(self.futures) > self.max_entries:
+                self.futures.popitem(last=False)
+        # Failed renders are not kept, so the next rerun retries
+        future.add_done_callback(lambda f: f.exception() and self._forget(key, f))
+        return future
+
+    def _forget(self, key, future):
+        with self.lock:
+            if self.futures.get(key) is future:
+                del self.futures[key]
@@ -0,0 +1,144 @@
+"""
+Headless batch entry point - runs without Streamlit, Plotly or matplotlib.
+
+Usage:
+    python -m ysa analyze --videos list.txt --out results.parquet
+    python -m ysa analyze --channels channels.txt --per-channel 5 --out results.csv.gz
+    python -m ysa search "audio quality" --sentiment Negative
+
+Input files hold one URL per line (blank lines and '#' comments are skipped).
+Channels can be given as /channel/UC... or /@handle URLs, channel IDs, or any
+video URL from the channel.
+Set YOUTUBE_API_KEY in the environment.
+"""
+import argparse
+import sys
+import time
+
+import helper
+import logic
+import pipeline
+import cache
+import search
+import model_server
+import export
+
+def read_list(path):
+    """
+    Reads one URL per line, skipping blanks and '#' comments.
+    """
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.strip().startswith("#")]
+
+def channel_video_urls(channel_urls, per_channel):
+    """
+    Expands channel URLs, IDs or handles (or video-from-channel URLs) into
+    their latest video URLs (see helper.get_channel_id).
+    """
+    urls = []
+    for url in channel_urls:
+        cid = helper.get_channel_id(url)
+        videos = helper.fetch_channel_videos(cid, limit=per_channel) if cid else {"error": "channel not found"}
+        if isinstance(videos, dict):
+            log(f"skip channel {url}: {videos['error']}")
+            continue
+        urls.extend(v['url'] for v in videos)
+    return urls
+
+def log(message):
+    print(message, file=sys.stderr, flush=True)
+
+def analyze(args):
+    urls = read_list(args.videos) if args.videos else []
+    if args.channels:
+        urls += channel_video_urls(read_list(args.channels), args.per_channel)
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        log("No videos to analyze.")
+        return 1
+
+    started = time.perf_counter()
+    if args.model_server:
+        model = model_server.RemoteModel(args.model_server)
+    else:
+        model = logic.load_bert_model(args.backend)
+    analysis_cache = None if args.no_cache else cache.AnalysisCache(args.cache_path)
+    history = None if args.no_cache else search.HistoryIndex(args.cache_path)
+    log(f"Model ready in {time.perf_counter() - started:.1f}s. Analyzing {len(urls)} videos...")
+
+    # Each video's rows are appended (in chunks) as soon as it is ready
+    writer = export.ExportWriter(args.out)
+    failed = 0
+
+    def report(url, result, done, total):
+        nonlocal failed
+        if isinstance(result, dict):
+            failed += 1
+            log(f"[{done}/{total}] FAILED {url}: {result['error']}")
+            return
+        if not result.empty:
+            result.insert(0, 'Video_Url', url)
+            writer.write(result)
+        log(f"[{done}/{total}] {url}: {len(result)} comments")
+
+    try:
+        pipeline.analyze_videos(urls, model, cache=analysis_cache, max_workers=args.workers,
+                                on_progress=report, keep_results=False, history=history,
+                                max_comments=args.max_comments, max_replies=args.max_replies,
+                                min_replies=args.min_replies)
+    finally:
+        writer.close()
+
+    log(f"Wrote {writer.rows} rows to {args.out} in {time.perf_counter() - started:.1f}s ({failed} failed).")
+    return 1 if failed == len(urls) else 0
+
+def search_history(args):
+    results = search.HistoryIndex(args.cache_path).search(
+        args.query, top_k=args.top_k, video_ids=args.video, since=args.since,
+        until=args.until, sentiments=args.sentiment)
+    if results.empty:
+        log("No matching comments.")
+        return 1
+    print(results.to_string(index=False))
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="ysa", description="YouTube comment sentiment (headless)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("analyze", help="fetch + score videos and write a columnar file")
+    p.add_argument("--videos", help="file with one video URL per line")
+    p.add_argument("--channels", help="file with one channel URL (/channel/UC..., /@handle, /user/name), channel ID "
+                                       "or channel video URL per line")
+    p.add_argument("--per-channel", type=int, default=5, help="latest videos per channel")
+    p.add_argument("--out", required=True, help="output file (.parquet, .csv.gz, .jsonl or .csv)")
+    p.add_argument("--max-comments", type=int, default=helper.DEFAULT_MAX_COMMENTS)
+    p.add_argument("--max-replies", type=int, default=0,
+                   help="also fetch up to this many replies per video, busiest threads first (0 = off)")
+    p.add_argument("--min-replies", type=int, default=helper.DEFAULT_MIN_REPLIES,
+                   help="only expand threads with at least this many replies")
+    p.add_argument("--workers", type=int, default=5, help="videos fetched at once")
+    p.add_argument("--backend", choices=logic.BACKENDS, default=logic.DEFAULT_BACKEND)
+    p.add_argument("--model-server", default=model_server.MODEL_SERVER_URL,
+                   help="score on a running model_server.py (default: $YSA_MODEL_SERVER)")
+    p.add_argument("--cache-path", default=cache.DEFAULT_DB_PATH)
+    p.add_argument("--no-cache", action="store_true")
+    p.set_defaults(func=analyze)
+
+    p = commands.add_parser("search", help="full-text search over every analyzed video")
+    p.add_argument("query")
+    p.add_argument("--video", action="append", help="video ID filter (repeatable)")
+    p.add_argument("--sentiment", action="append", choices=["Positive", "Negative", "Neutral"])
+    p.add_argument("--since", help="published on/after (YYYY-MM-DD)")
+    p.add_argument("--until", help="published before (YYYY-MM-DD)")
+    p.add_argument("--top-k", type=int, default=20)
+    p.add_argument("--cache-path", default=cache.DEFAULT_DB_PATH)
+    p.set_defaults(func=search_history)
+
+    args = parser.parse_args(argv)
+    if args.command == "analyze" and not (args.videos or args.channels):
+        parser.error("analyze needs --videos and/or --channels")
+    return args.func(args)
+
+if __name__ == "__main__":
+    sys.exit(main())